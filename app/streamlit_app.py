@@ -2,32 +2,36 @@
 # Imports & config
 # =========================
 
+import os
 import streamlit as st
 import pandas as pd
 import time
 
-from logger import get_logger
+from env import load_environment
+from logger import setup_logging
 from db import get_engine
+from metrics import start_metrics_server
 
 from repository import (
-    get_prices_series, 
-    get_indicator_series, 
     get_available_tickers, 
-    get_normalized_prices
+    get_dashboard_view,
+    choose_resolution,
+    get_latest_snapshot,
     )
 
-from ai import (
-    summarize_technical_state,
-    build_ai_prompt,
-    get_ai_analysis,
-    get_openai_client
-)
+from ai import openai_configured
+from ai_cache import build_ticker_prompt, get_or_generate_analysis
 
 # --- Application bootstrap ---
-logger = get_logger()
+load_environment()
+logger = setup_logging()
 
 engine = get_engine()
 
+# Query latency / cache hit metrics for Prometheus (one server per process)
+if os.getenv("METRICS_PORT"):
+    start_metrics_server(int(os.getenv("METRICS_PORT")))
+
 # --- Layout ---
 
 st.set_page_config(
@@ -48,9 +52,9 @@ df_single = pd.DataFrame()
 df_single_ind = pd.DataFrame()
 
 # --- AI config ---
-@st.cache_data(ttl=3600)
-def cached_ai_analysis(prompt: str) -> str:
-    return get_ai_analysis(prompt)
+# Stored in Postgres (ai_analyses), shared across sessions, restarts and replicas
+def cached_ai_analysis(prompt: str, ticker: str) -> str:
+    return get_or_generate_analysis(prompt, engine, ticker=ticker)
 
 # User override --- Mobile toggle (stored in session)
 
@@ -106,7 +110,7 @@ if not is_mobile:
     show_ma_50 = st.sidebar.checkbox("MA 50", value=False)
 
 # --- AI Indicator toggles ---
-ai_available = get_openai_client() is not None
+ai_available = openai_configured()
 
 if not is_mobile and ai_available:
     st.sidebar.subheader("AI Technical Summary")
@@ -138,32 +142,32 @@ mapping = {
 
 start_date = end_date - pd.Timedelta(days=mapping[range_option])
 
-# =========================
-# Data loading (cached)
-# =========================
+# Each ticker's lines are min/max-downsampled in the repository to about
+# this many points of their own, whatever the range; tickers share dates,
+# so a multi-ticker view can hold more
+MAX_CHART_POINTS = 800
 
-@st.cache_data(ttl=600)
-def load_prices_cached(tickers, start_date, end_date):
-    start = time.perf_counter()
-    df = get_prices_series(engine, tickers, start_date, end_date)
-    elapsed = time.perf_counter() - start
+# Long ranges are charted from weekly/monthly rollups
+CHART_RESOLUTION = choose_resolution(start_date, end_date)
 
-    if elapsed > 0.5:
-        logger.warning(
-            "Slow DB query",
-            extra={
-                "tickers": tickers,
-                "rows": len(df),
-                "seconds": round(elapsed, 3),
-            },
-        )
+# =========================
+# Data loading
+# =========================
 
-    return df
+# Caching lives in the repository layer: segments are shared across
+# sessions/replicas and invalidated as soon as the pipeline writes.
 
-@st.cache_data(ttl=600)
-def load_indicator_cached(tickers, start_date, end_date):
+def load_view(tickers, start_date, end_date):
+    """Price, indicator and normalized series of one rerun, from one load."""
     start = time.perf_counter()
-    df = get_indicator_series(engine, tickers, start_date, end_date)
+    view = get_dashboard_view(
+        engine,
+        tickers,
+        start_date,
+        end_date,
+        max_points=MAX_CHART_POINTS,
+        resolution=CHART_RESOLUTION,
+    )
     elapsed = time.perf_counter() - start
 
     if elapsed > 0.5:
@@ -171,24 +175,21 @@ def load_indicator_cached(tickers, start_date, end_date):
             "Slow DB query",
             extra={
                 "tickers": tickers,
-                "rows": len(df),
+                "rows": len(view["indicators"]),
                 "seconds": round(elapsed, 3),
             },
         )
 
-    return df
+    return view
 
-df_all = load_prices_cached(
+view = load_view(
     compare_tickers,
     start_date,
     end_date,
 )
 
-df_all_ind = load_indicator_cached(
-    compare_tickers,
-    start_date,
-    end_date,
-)
+df_all = view["prices"]
+df_all_ind = view["indicators"]
 
 if not primary_ticker:
     st.info("Select a ticker to begin.")
@@ -227,6 +228,9 @@ with tab_price:
             height=300 if is_mobile else 450,
         )
 
+        if CHART_RESOLUTION != "daily":
+            st.caption(f"{CHART_RESOLUTION.capitalize()} bars; moving averages in {CHART_RESOLUTION} periods.")
+
 with tab_compare:
     if is_mobile:
         st.warning("📱 Comparison view is best experienced on desktop.")
@@ -234,12 +238,7 @@ with tab_compare:
         if len(compare_tickers) > 1:
             st.subheader("Normalized Performance Comparison")
 
-            df_norm = get_normalized_prices(
-                engine,
-                compare_tickers,
-                start_date,
-                end_date,
-            )
+            df_norm = view["normalized"]
 
             df_pivot = df_norm.pivot(
                 index="date",
@@ -293,9 +292,10 @@ if is_mobile and ai_available:
             if st.button("Generate AI Summary"):
                 try:
                     with st.spinner("Analyzing technical indicators..."):
-                        summary_text = summarize_technical_state(df_single)
-                        prompt = build_ai_prompt(summary_text)
-                        ai_text = cached_ai_analysis(prompt)
+                        prompt = build_ticker_prompt(
+                            get_latest_snapshot(engine, primary_ticker)
+                        )
+                        ai_text = cached_ai_analysis(prompt, primary_ticker)
 
                     st.markdown(ai_text)
 
@@ -319,9 +319,10 @@ if not is_mobile and ai_available and show_ai:
 
         try:
             with st.spinner("Generating AI technical summary..."):
-                summary_text = summarize_technical_state(df_single)
-                prompt = build_ai_prompt(summary_text)
-                ai_text = cached_ai_analysis(prompt)
+                prompt = build_ticker_prompt(
+                    get_latest_snapshot(engine, primary_ticker)
+                )
+                ai_text = cached_ai_analysis(prompt, primary_ticker)
 
             st.markdown(ai_text)
 
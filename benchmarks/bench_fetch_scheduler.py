@@ -0,0 +1,231 @@
+import json
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+# Add src/ to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+import pandas as pd
+import requests
+
+from fetch_scheduler import FetchScheduler
+from fetch_yahoo import _request_history
+from logger import setup_logging
+from synthetic import ticker_bars
+
+# =====================================================
+# BENCHMARK: fetch scheduler against a local fake Yahoo endpoint
+#
+# yfinance's shared session is replaced by one that sends every request
+# (cookie, crumb, chart) to a local server, so each fetch runs the real
+# path: fetch_yahoo._request_history -> yfinance -> HTTP -> parsing.
+# The fake chart endpoint serves RATE_LIMIT requests/s (with a small
+# burst) of synthetic bars and answers 429 beyond that, like Yahoo
+# throttling. The same ticker list is fetched by unscheduled threads and
+# through FetchScheduler; compare failures and sustained throughput.
+# No network or database needed.
+# =====================================================
+
+RATE_LIMIT = 20.0
+LATENCY_SECONDS = 0.05
+
+# Chart requests per fetch of a new ticker: timezone lookup, then history
+REQUESTS_PER_FETCH = 2
+
+# Years of synthetic history served per ticker
+YEARS = 1
+
+# Daily bars are stamped at the 09:30 New York open (UTC, summer time)
+OPEN_OFFSET = pd.Timedelta(hours=13, minutes=30)
+
+class ServerLimiter:
+    """Server-side token bucket: rejects a request instead of making it wait."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+def chart_response(ticker, query):
+    """Yahoo's /v8/finance/chart JSON for the synthetic bars of the requested range."""
+    bars = ticker_bars(ticker, YEARS)
+    stamps = (bars["date"] + OPEN_OFFSET).astype("datetime64[s]").astype("int64")
+
+    if "period1" in query:
+        keep = (stamps >= int(query["period1"][0])) & (stamps < int(query["period2"][0]))
+    else:
+        # The timezone lookup (range=1d)
+        keep = stamps >= stamps.iloc[-1]
+    bars, stamps = bars[keep], stamps[keep]
+
+    quote = {column: bars[column].round(4).tolist() for column in ["open", "high", "low", "close"]}
+    quote["volume"] = bars["volume"].tolist()
+
+    return {
+        "chart": {
+            "result": [{
+                "meta": {
+                    "currency": "USD",
+                    "symbol": ticker,
+                    "exchangeName": "NMS",
+                    "instrumentType": "EQUITY",
+                    "gmtoffset": -14400,
+                    "timezone": "EDT",
+                    "exchangeTimezoneName": "America/New_York",
+                    "regularMarketPrice": quote["close"][-1] if quote["close"] else None,
+                    "dataGranularity": "1d",
+                    "priceHint": 2,
+                },
+                "timestamp": stamps.tolist(),
+                "indicators": {"quote": [quote], "adjclose": [{"adjclose": quote["close"]}]},
+            }],
+            "error": None,
+        }
+    }
+
+class FakeYahooHandler(BaseHTTPRequestHandler):
+    limiter = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+
+        if url.path == "/v1/test/getcrumb":
+            return self.reply(200, b"fake-crumb", "text/plain; charset=utf-8")
+
+        if not url.path.startswith("/v8/finance/chart/"):
+            # fc.yahoo.com, the consent pages and anything else: a cookie-less page
+            return self.reply(200, b"<html><body></body></html>", "text/html; charset=utf-8")
+
+        time.sleep(LATENCY_SECONDS)
+
+        if not self.limiter.try_acquire():
+            return self.reply(429, b"Too Many Requests", "text/plain; charset=utf-8")
+
+        ticker = url.path.rsplit("/", 1)[-1]
+        body = json.dumps(chart_response(ticker, parse_qs(url.query))).encode()
+        self.reply(200, body, "application/json")
+
+    def reply(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class FakeYahooSession(requests.Session):
+    """Sends each request yfinance makes to `base_url`, keeping path and query."""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        local = f"{self.base_url}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+        return super().request(method, local, *args, **kwargs)
+
+def start_fake_yahoo():
+    FakeYahooHandler.limiter = ServerLimiter(RATE_LIMIT, burst=5)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeYahooHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def use_fake_yahoo(base_url, cache_dir):
+    import yfinance as yf
+    from yfinance.data import YfData
+
+    # Keep the timezone/cookie caches out of the user's cache directory
+    yf.set_tz_cache_location(cache_dir)
+    # yfinance shares one YfData (and session) across all Ticker objects
+    YfData(session=FakeYahooSession(base_url))
+
+def run(fetch, tickers, threads):
+    failures = {}
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def one(ticker):
+        try:
+            df = fetch(ticker)
+            error = None if len(df) else "empty"
+        except Exception as e:
+            error = type(e).__name__
+
+        if error:
+            with lock:
+                failures[error] = failures.get(error, 0) + 1
+
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(one, tickers))
+
+    elapsed = time.perf_counter() - started
+    failed = sum(failures.values())
+    return {
+        "tickers": len(tickers),
+        "failed": failed,
+        "failures": failures,
+        "seconds": round(elapsed, 2),
+        "succeeded_per_second": round((len(tickers) - failed) / elapsed, 1),
+    }
+
+def main(count: int = 200):
+    setup_logging()
+    server = start_fake_yahoo()
+
+    bars = ticker_bars("T0", YEARS)
+    start, end = bars["date"].iloc[0].date(), bars["date"].iloc[-1].date()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        use_fake_yahoo(f"http://127.0.0.1:{server.server_port}", cache_dir)
+
+        # Separate ticker sets: yfinance memoizes responses per URL
+        results = {
+            "unscheduled": run(
+                lambda t: _request_history(t, start, end),
+                [f"U{i}" for i in range(count)], threads=16,
+            )
+        }
+
+        scheduler = FetchScheduler(
+            rate_per_second=RATE_LIMIT / REQUESTS_PER_FETCH * 0.9,
+            burst=5,
+            concurrency=4,
+            max_concurrency=16,
+            max_attempts=6,
+            backoff_base=0.2,
+            backoff_max=5.0,
+        )
+        results["scheduled"] = run(
+            lambda t: scheduler.call(_request_history, t, start, end, ticker=t),
+            [f"S{i}" for i in range(count)], threads=16,
+        )
+        results["scheduled"]["scheduler"] = scheduler.stats()
+
+    server.shutdown()
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
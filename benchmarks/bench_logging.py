@@ -0,0 +1,97 @@
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+# Add src/ to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+from logger import setup_logging, shutdown_logging
+
+# =====================================================
+# BENCHMARK: logging overhead on the calling thread
+#
+# THREADS threads each emit `count` per-ticker records shaped like the
+# pipeline's (%-style args + extra=) into a scratch log file, for each
+# logging mode. "caller" is the time spent inside logger calls by the
+# emitting threads; "total" also includes draining the async queue.
+# The "disabled" modes log below the configured level, comparing lazy
+# %-style arguments with an eager f-string.
+# No network or database needed.
+# =====================================================
+
+THREADS = 8
+
+# INFO records per ticker in a typical incremental run
+RECORDS_PER_TICKER = 12
+
+MODES = {
+    "sync_text": {"async_mode": False, "json_format": False, "level": "INFO"},
+    "async_text": {"async_mode": True, "json_format": False, "level": "INFO"},
+    "async_json": {"async_mode": True, "json_format": True, "level": "INFO"},
+    "disabled_lazy": {"async_mode": True, "json_format": False, "level": "WARNING"},
+    "disabled_eager": {"async_mode": True, "json_format": False, "level": "WARNING", "eager": True},
+}
+
+def emit(logger, count, eager):
+    start = date(2024, 1, 2)
+    for i in range(count):
+        ticker = f"T{i % 500}"
+        if eager:
+            logger.info(
+                f"Upserted into daily_prices: {i} inserted, 0 skipped from {start.isoformat()}",
+                extra={"ticker": ticker},
+            )
+        else:
+            logger.info(
+                "Upserted into %s: %d inserted, %d skipped from %s",
+                "daily_prices", i, 0, start,
+                extra={"ticker": ticker},
+            )
+
+def run(mode, count, directory):
+    settings = dict(MODES[mode])
+    eager = settings.pop("eager", False)
+    log_file = Path(directory) / f"{mode}.log"
+
+    name = f"bench_logging.{mode}"
+    logger = setup_logging(name, log_file=log_file, console=False, **settings)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=emit, args=(logger, count, eager)) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    caller = time.perf_counter() - started
+
+    shutdown_logging(name)
+    total = time.perf_counter() - started
+
+    records = THREADS * count
+    us_per_record = caller / records * 1e6
+    return {
+        "records": records,
+        "caller_seconds": round(caller, 3),
+        "total_seconds": round(total, 3),
+        "caller_us_per_record": round(us_per_record, 2),
+        "caller_ms_per_1000_tickers": round(us_per_record * RECORDS_PER_TICKER, 2),
+        # Including rotated files
+        "log_bytes": sum(f.stat().st_size for f in Path(directory).glob(f"{mode}.log*")),
+    }
+
+def main(count: int = 20_000):
+    with tempfile.TemporaryDirectory() as directory:
+        results = {mode: run(mode, count, directory) for mode in MODES}
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    # Records from the bench loggers must not also reach the root logger
+    logging.getLogger("bench_logging").propagate = False
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
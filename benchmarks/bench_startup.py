@@ -0,0 +1,107 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# =====================================================
+# BENCHMARK: import time of each entry point
+#
+# Imports every entry point in a fresh interpreter (without running it)
+# and checks the median against its budget. Also fails if an import
+# loads a heavy dependency it only needs later, or has side effects
+# (logging handlers attached). Run without OPENAI_API_KEY, so importing
+# must not need one. No network or database needed.
+#
+#   python benchmarks/bench_startup.py [repeats]
+#
+# Exits non-zero when a budget is exceeded.
+# =====================================================
+
+LAZY = ["openai", "yfinance", "streamlit"]
+
+ENTRY_POINTS = {
+    "run_all": {"script": "scripts/run_all.py", "budget_seconds": 1.5},
+    "run_worker": {"script": "scripts/run_worker.py", "budget_seconds": 1.5},
+    "pregenerate_ai": {"script": "scripts/pregenerate_ai.py", "budget_seconds": 1.5},
+    # The dashboard's own modules; streamlit itself is imported by `streamlit run`
+    "dashboard": {
+        "modules": ["env", "logger", "db", "metrics", "repository", "ai", "ai_cache"],
+        "budget_seconds": 1.5,
+    },
+}
+
+PROBE = """
+import importlib, importlib.util, json, logging, sys, time
+
+spec = json.loads(sys.argv[1])
+sys.path[:0] = [spec["root"], spec["root"] + "/src"]
+
+started = time.perf_counter()
+if "script" in spec:
+    loader = importlib.util.spec_from_file_location("entry_point", spec["root"] + "/" + spec["script"])
+    loader.loader.exec_module(importlib.util.module_from_spec(loader))
+else:
+    for module in spec["modules"]:
+        importlib.import_module(module)
+elapsed = time.perf_counter() - started
+
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [m for m in spec["lazy"] if m in sys.modules],
+    "handlers": len(logging.getLogger("yfinance_pipeline").handlers),
+}))
+"""
+
+def probe(entry):
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    spec = {**entry, "root": str(PROJECT_ROOT), "lazy": LAZY}
+
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, json.dumps(spec)],
+        capture_output=True, text=True, env=env, cwd=PROJECT_ROOT,
+    )
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1])
+    return json.loads(out.stdout)
+
+def main(repeats: int = 5):
+    results, failed = {}, []
+
+    for name, entry in ENTRY_POINTS.items():
+        try:
+            probe(entry)  # warm the OS file cache and bytecode
+            runs = [probe(entry) for _ in range(repeats)]
+        except RuntimeError as e:
+            results[name] = {"error": str(e)}
+            failed.append(name)
+            continue
+
+        median = statistics.median(run["seconds"] for run in runs)
+        result = {
+            "median_seconds": round(median, 3),
+            "max_seconds": round(max(run["seconds"] for run in runs), 3),
+            "budget_seconds": entry["budget_seconds"],
+            "lazy_modules_loaded": runs[0]["loaded"],
+            "logging_handlers_attached": runs[0]["handlers"],
+        }
+        result["ok"] = (
+            median <= entry["budget_seconds"]
+            and not result["lazy_modules_loaded"]
+            and not result["logging_handlers_attached"]
+        )
+        results[name] = result
+        if not result["ok"]:
+            failed.append(name)
+
+    print(json.dumps(results, indent=2))
+
+    if failed:
+        print(f"Over budget or not side-effect free: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
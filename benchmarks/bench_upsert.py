@@ -0,0 +1,65 @@
+import math
+import sys
+import time
+from pathlib import Path
+
+# Add src/ to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+import pandas as pd
+from sqlalchemy import text
+
+from db import get_engine, upsert_prices
+from logger import setup_logging
+from synthetic import TRADING_DAYS_PER_YEAR, ticker_bars
+from transform import compute_indicators
+
+# =====================================================
+# BENCHMARK: upsert_prices "insert" vs "copy" path
+#
+# Writes into a scratch copy of daily_prices, never into the real table.
+# Needs the same POSTGRES_* environment as the pipeline.
+# =====================================================
+
+BENCH_TABLE = "bench_daily_prices"
+
+def bench_prices(ticker: str, rows: int) -> pd.DataFrame:
+    """The last `rows` synthetic bars of `ticker`, with indicators."""
+    years = math.ceil(rows / TRADING_DAYS_PER_YEAR)
+    df = ticker_bars(ticker, years).tail(rows).reset_index(drop=True)
+    return compute_indicators(df)
+
+def reset_table(engine):
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        conn.execute(text(
+            f"CREATE TABLE {BENCH_TABLE} (LIKE daily_prices INCLUDING ALL)"
+        ))
+
+def time_method(engine, df, method):
+    reset_table(engine)
+
+    started = time.perf_counter()
+    result = upsert_prices(df, engine, table_name=BENCH_TABLE, method=method)
+    elapsed = time.perf_counter() - started
+
+    return elapsed, result
+
+def main(rows: int = 26_000):
+    setup_logging()
+    engine = get_engine()
+    df = bench_prices("BENCH", rows)
+
+    for method in ("insert", "copy"):
+        elapsed, result = time_method(engine, df, method)
+        print(
+            f"{method:>6}: {rows} rows in {elapsed:.3f}s "
+            f"({rows / elapsed:,.0f} rows/s) {result}"
+        )
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 26_000)
@@ -0,0 +1,55 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# =====================================================
+# BENCHMARK: compare two run_benchmarks.py result files
+#
+#   python benchmarks/compare.py OLD.json NEW.json [--threshold 0.10]
+#
+# Prints median seconds of both runs per benchmark and flags the ones
+# slower than OLD by more than the threshold; exits non-zero if any are.
+# Only compare runs with the same params on the same machine.
+# =====================================================
+
+def load(path):
+    return json.loads(Path(path).read_text())
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+
+    if old["params"] != new["params"]:
+        print(f"Warning: params differ: {old['params']} vs {new['params']}", file=sys.stderr)
+
+    print(f"{'benchmark':<34} {'old':>10} {'new':>10} {'change':>8}")
+
+    regressions = []
+    for name, result in new["results"].items():
+        if name not in old["results"]:
+            print(f"{name:<34} {'-':>10} {result['median_seconds']:>10.4f}")
+            continue
+
+        before = old["results"][name]["median_seconds"]
+        after = result["median_seconds"]
+        change = after / before - 1 if before else 0.0
+
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+
+        print(f"{name:<34} {before:>10.4f} {after:>10.4f} {change:>+8.1%}{flag}")
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower by more than {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add src/ to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from sqlalchemy import create_engine, text
+
+from bar_cache import configure_raw_cache
+from db import get_engine, upsert_prices
+from fetch_scheduler import configure_fetch_scheduler
+from fetch_yahoo import fetch_daily_prices
+from logger import setup_logging
+from metrics import reset as reset_metrics, snapshot as metrics_snapshot
+from migrations import run_migrations
+from pipeline import run_pipeline
+from query_cache import get_query_cache
+from repository import (
+    get_dashboard_view,
+    get_indicator_series,
+    get_latest_snapshot,
+    get_prices_series,
+    screen_tickers,
+)
+from synthetic import fake_yahoo, synthetic_ohlcv, synthetic_tickers
+from transform import compute_indicators, compute_indicators_incremental, compute_indicators_panel
+
+# =====================================================
+# BENCHMARK SUITE
+#
+# Microbenchmarks (indicators, fetch parsing, upsert, repository queries)
+# and end-to-end run_pipeline runs over synthetic data for N tickers x M
+# years, with Yahoo replaced by synthetic bars (benchmarks/synthetic.py).
+# Results go to benchmarks/results/<timestamp>_<commit>.json; compare two
+# runs with benchmarks/compare.py.
+#
+#   python benchmarks/run_benchmarks.py --tickers 50 --years 10
+#   python benchmarks/run_benchmarks.py --skip-db     # CPU-only parts
+#
+# The database parts need the POSTGRES_* environment (e.g. the compose
+# db service) or --database-url. They write synthetic SYN* tickers into
+# the real tables and delete them again afterwards; upsert_prices runs
+# against a scratch copy of daily_prices.
+# =====================================================
+
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+BENCH_TABLE = "bench_daily_prices"
+
+# Tables holding per-ticker rows written by the pipeline
+TICKER_TABLES = ["daily_prices", "price_rollups", "latest_snapshot", "data_versions", "tickers"]
+
+# Tickers charted by the repository benchmarks
+QUERY_TICKERS = 5
+
+def measure(fn, repeats, rows=0, setup=None):
+    """Median/min/max seconds of fn() over `repeats` runs; setup() runs untimed before each."""
+    timings = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    median = statistics.median(timings)
+    return {
+        "repeats": repeats,
+        "median_seconds": round(median, 6),
+        "min_seconds": round(min(timings), 6),
+        "max_seconds": round(max(timings), 6),
+        "rows": rows,
+        "rows_per_second": round(rows / median, 1) if rows and median else None,
+    }
+
+def cpu_benchmarks(data, tickers, years, repeats):
+    results = {}
+    one = data[data["ticker"] == tickers[0]].reset_index(drop=True)
+
+    results["compute_indicators"] = measure(lambda: compute_indicators(one), repeats, len(one))
+
+    # A daily incremental load: 1 new bar seeded with the stored tail
+    seed, new = one.iloc[:-1].tail(60), one.iloc[-1:]
+    results["compute_indicators_incremental"] = measure(
+        lambda: compute_indicators_incremental(new, seed), repeats, len(new)
+    )
+
+    panel = data[["ticker", "date", "close"]]
+    results["compute_indicators_panel"] = measure(
+        lambda: compute_indicators_panel(panel), repeats, len(panel)
+    )
+
+    with fake_yahoo(years):
+        start = one["date"].iloc[0].date()
+        results["fetch_parse"] = measure(
+            lambda: fetch_daily_prices(tickers[0], start=start), repeats, len(one)
+        )
+
+    return results
+
+def delete_tickers(engine, tickers):
+    with engine.begin() as conn:
+        for table in TICKER_TABLES:
+            conn.execute(
+                text(f"DELETE FROM {table} WHERE ticker = ANY(:tickers)"),
+                {"tickers": list(tickers)},
+            )
+
+def reset_bench_table(engine):
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        conn.execute(text(f"CREATE TABLE {BENCH_TABLE} (LIKE daily_prices INCLUDING ALL)"))
+
+def db_benchmarks(engine, data, tickers, years, repeats, workers):
+    results = {}
+
+    # --- upsert_prices into a scratch table ---
+    prices = compute_indicators_panel(data)
+    results["upsert_prices"] = measure(
+        lambda: upsert_prices(prices, engine, table_name=BENCH_TABLE),
+        repeats,
+        len(prices),
+        setup=lambda: reset_bench_table(engine),
+    )
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+    # --- end to end: full history load, then a no-op incremental run ---
+    with fake_yahoo(years):
+        def full_load():
+            summary = run_pipeline(tickers, engine, workers=workers)
+            if summary["failed"]:
+                raise RuntimeError(f"Pipeline failed: {summary['failed']}")
+
+        def fresh():
+            delete_tickers(engine, tickers)
+            reset_metrics()
+
+        results["run_pipeline_full"] = measure(full_load, repeats, len(data), setup=fresh)
+        results["run_pipeline_full"]["stages"] = metrics_snapshot()["stages"]
+
+        results["run_pipeline_incremental"] = measure(
+            lambda: run_pipeline(tickers, engine, workers=workers), repeats
+        )
+
+    # --- repository queries over the loaded tickers ---
+    shown = tickers[:QUERY_TICKERS]
+    end = data["date"].max().date()
+    one_year = (data["date"].max() - pd.DateOffset(years=1)).date()
+    all_years = data["date"].min().date()
+    shown_rows = int(data["ticker"].isin(shown).sum())
+
+    # Empties the backing store too (the shared Redis entries, when
+    # REPOSITORY_CACHE_URL is set), not just this process' handle on it
+    cold = get_query_cache().clear
+
+    results["get_latest_snapshot"] = measure(lambda: get_latest_snapshot(engine), repeats, len(tickers))
+    results["screen_tickers"] = measure(
+        lambda: screen_tickers(engine, rsi_below=50, min_return=0), repeats
+    )
+    results["get_prices_series_1y_cold"] = measure(
+        lambda: get_prices_series(engine, shown, one_year, end), repeats, setup=cold
+    )
+    results["get_indicator_series_1y_cold"] = measure(
+        lambda: get_indicator_series(engine, shown, one_year, end), repeats, setup=cold
+    )
+    results["get_dashboard_view_all_cold"] = measure(
+        lambda: get_dashboard_view(engine, shown, all_years, end, max_points=2000),
+        repeats, shown_rows, setup=cold,
+    )
+    results["get_dashboard_view_all_warm"] = measure(
+        lambda: get_dashboard_view(engine, shown, all_years, end, max_points=2000),
+        repeats, shown_rows,
+    )
+    results["get_dashboard_view_all_auto"] = measure(
+        lambda: get_dashboard_view(engine, shown, all_years, end, resolution="auto"),
+        repeats, setup=cold,
+    )
+
+    return results
+
+def git_revision():
+    def git(*args):
+        out = subprocess.run(["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() if out.returncode == 0 else None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4, help="run_pipeline workers")
+    parser.add_argument("--skip-db", action="store_true", help="only the CPU benchmarks")
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: POSTGRES_* env)")
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    setup_logging(level="ERROR")
+
+    # Synthetic bars only: no disk cache, no rate limit
+    configure_raw_cache({"enabled": False})
+    configure_fetch_scheduler({
+        "rate_per_second": 1e9, "burst": 1e9,
+        "concurrency": 64, "min_concurrency": 64, "max_concurrency": 64,
+    })
+
+    tickers = synthetic_tickers(args.tickers)
+    data = synthetic_ohlcv(tickers, args.years)
+
+    started = datetime.now(timezone.utc)
+    results = cpu_benchmarks(data, tickers, args.years, args.repeats)
+
+    if not args.skip_db:
+        engine = create_engine(args.database_url) if args.database_url else get_engine()
+        run_migrations(engine)
+        try:
+            results.update(db_benchmarks(engine, data, tickers, args.years, args.repeats, args.workers))
+        finally:
+            delete_tickers(engine, tickers)
+
+    revision = git_revision()
+    report = {
+        "started_at": started.isoformat(),
+        "git": revision,
+        "params": {
+            "tickers": args.tickers,
+            "years": args.years,
+            "rows": len(data),
+            "repeats": args.repeats,
+            "workers": args.workers,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sqlalchemy": sqlalchemy.__version__,
+            "query_cache": type(get_query_cache()).__name__,
+        },
+        "results": results,
+    }
+
+    output = args.output or RESULTS_DIR / (
+        f"{started.strftime('%Y%m%dT%H%M%SZ')}_{(revision['commit'] or 'unknown')[:8]}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+
+    for name, result in results.items():
+        rate = f"{result['rows_per_second']:>14,.0f} rows/s" if result["rows_per_second"] else ""
+        print(f"{name:<34} {result['median_seconds']:>10.4f}s {rate}")
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
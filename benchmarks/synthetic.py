@@ -0,0 +1,109 @@
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# Synthetic market data for the benchmarks
+#
+# Deterministic OHLCV bars (geometric Brownian motion closes, gapped
+# opens, high/low around both) for N tickers x M years of business days,
+# and a stand-in for yfinance.Ticker serving them in the shape Yahoo
+# returns, so fetch parsing and whole pipeline runs can be benchmarked
+# without network access.
+# =====================================================
+
+TRADING_DAYS_PER_YEAR = 261
+
+def synthetic_tickers(count: int, prefix: str = "SYN") -> list:
+    return [f"{prefix}{i:04d}" for i in range(count)]
+
+@lru_cache(maxsize=4096)
+def _bars(ticker: str, years: int, end: pd.Timestamp, seed: int) -> pd.DataFrame:
+    rows = int(years * TRADING_DAYS_PER_YEAR)
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()) ^ seed)
+
+    close = 20 + 180 * rng.random()
+    close *= np.exp(np.cumsum(rng.normal(0.0003, 0.015, rows)))
+
+    open_ = np.empty(rows)
+    open_[0] = close[0]
+    open_[1:] = close[:-1] * (1 + rng.normal(0, 0.004, rows - 1))
+
+    spread = np.abs(rng.normal(0, 0.008, (2, rows)))
+
+    return pd.DataFrame({
+        "date": pd.bdate_range(end=end, periods=rows),
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + spread[0]),
+        "low": np.minimum(open_, close) * (1 - spread[1]),
+        "close": close,
+        "volume": rng.lognormal(13, 1, rows).astype("int64"),
+        "ticker": ticker,
+    })
+
+def ticker_bars(ticker: str, years: int = 10, end=None, seed: int = 0) -> pd.DataFrame:
+    """Bars of one ticker over the `years` before `end` (default: yesterday)."""
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+    return _bars(ticker, years, end.normalize(), seed).copy()
+
+def synthetic_ohlcv(tickers=10, years: int = 10, end=None, seed: int = 0) -> pd.DataFrame:
+    """
+    Long (date, open, high, low, close, volume, ticker) frame, as parsed
+    by fetch_daily_prices, for a ticker count or list.
+    """
+    if isinstance(tickers, int):
+        tickers = synthetic_tickers(tickers)
+
+    return pd.concat(
+        [ticker_bars(ticker, years, end, seed) for ticker in tickers],
+        ignore_index=True,
+    )
+
+def yahoo_history(ticker: str, start=None, end=None, years: int = 10) -> pd.DataFrame:
+    """Bars in [start, end) shaped like yfinance.Ticker.history() output."""
+    df = ticker_bars(ticker, years)
+
+    dates = df["date"]
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= dates >= pd.Timestamp(start)
+    if end is not None:
+        mask &= dates < pd.Timestamp(end)
+    df = df[mask]
+
+    index = pd.DatetimeIndex(df["date"]).tz_localize("America/New_York")
+    return pd.DataFrame(
+        {
+            "Open": df["open"].to_numpy(),
+            "High": df["high"].to_numpy(),
+            "Low": df["low"].to_numpy(),
+            "Close": df["close"].to_numpy(),
+            "Volume": df["volume"].to_numpy(),
+        },
+        index=index.rename("Date"),
+    )
+
+class FakeTicker:
+    years = 10
+
+    def __init__(self, ticker, session=None):
+        self.ticker = ticker
+
+    def history(self, start=None, end=None, **kwargs):
+        return yahoo_history(self.ticker, start, end, self.years)
+
+@contextmanager
+def fake_yahoo(years: int = 10):
+    """Serve yfinance.Ticker(...).history() from synthetic bars."""
+    import yfinance
+
+    original = yfinance.Ticker
+    FakeTicker.years = years
+    yfinance.Ticker = FakeTicker
+    try:
+        yield
+    finally:
+        yfinance.Ticker = original
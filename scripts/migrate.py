@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.migrations import run_migrations, COMPACT_DIR
+from src.db import get_engine
+from src.logger import setup_logging
+
+# =====================================================
+# MAINTENANCE SCRIPT
+
+# Applies pending numbered files in sql/schema/ to an existing database
+# and creates upcoming yearly daily_prices partitions.
+# run_all.py does the same before every pipeline run.
+#
+# --compact additionally applies the opt-in sql/compact/ migrations
+# (float columns instead of NUMERIC).
+# =====================================================
+
+def main():
+    setup_logging()
+    engine = get_engine()
+
+    run_migrations(engine)
+
+    if "--compact" in sys.argv[1:]:
+        run_migrations(engine, COMPACT_DIR)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.ai_cache import DEFAULT_PREGENERATE_WORKERS, pregenerate_analyses
+from src.migrations import run_migrations
+from src.db import get_engine
+from src.logger import setup_logging
+
+# =====================================================
+# MAINTENANCE SCRIPT
+
+# Generate and store the AI technical summary of each ticker's latest bar
+# (all tickers by default); summaries already stored are skipped.
+# =====================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate AI technical summaries")
+    parser.add_argument("tickers", nargs="*", help="Tickers (default: all)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_PREGENERATE_WORKERS)
+    args = parser.parse_args()
+
+    setup_logging()
+    engine = get_engine()
+    run_migrations(engine)
+
+    result = pregenerate_analyses(engine, args.tickers or None, workers=args.workers)
+
+    if result["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.rollups import refresh_rollups
+from src.repository import get_available_tickers
+from src.db import get_engine
+from src.logger import setup_logging
+
+# =====================================================
+# MAINTENANCE SCRIPT
+
+# Rebuilds the weekly/monthly price_rollups of every ticker (or of the
+# tickers given on the command line) from their full daily history.
+# Migration 005 backfills them and the pipeline keeps them current;
+# run this after changing daily_prices outside the pipeline.
+# =====================================================
+
+def main():
+    setup_logging()
+    engine = get_engine()
+
+    for ticker in sys.argv[1:] or get_available_tickers(engine):
+        refresh_rollups(ticker, engine)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.pipeline import recompute_indicators, load_pipeline_config, DEFAULT_RECOMPUTE_BATCH
+from src.db import get_engine
+from src.logger import setup_logging
+
+# =====================================================
+# MAINTENANCE SCRIPT
+
+# Recomputes indicators over the full stored history of every ticker
+# (or of the tickers given on the command line) in vectorized batches.
+# Run after changing indicator windows / RSI period.
+# =====================================================
+
+def main():
+    setup_logging()
+    engine = get_engine()
+
+    batch_size = load_pipeline_config().get(
+        "recompute_batch_tickers", DEFAULT_RECOMPUTE_BATCH
+    )
+
+    recompute_indicators(
+        engine,
+        tickers=sys.argv[1:] or None,
+        batch_size=batch_size,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,32 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from src.pipeline import run_pipeline_from_config
+from src.pipeline import load_pipeline_config, run_pipeline_from_config
+from src.migrations import run_migrations
 from src.db import get_engine
+from src.logger import setup_logging
 
 # =====================================================
 # PRODUCTION SCRIPT
 # =====================================================
 
 def main():
+    setup_logging()
     engine = get_engine()
 
-    run_pipeline_from_config(engine)
+    run_migrations(engine)
+
+    summary = run_pipeline_from_config(engine)
+
+    # Optional: pre-generate AI summaries so the dashboard serves them instantly
+    settings = load_pipeline_config().get("ai_pregenerate") or {}
+    if settings.get("enabled"):
+        from src.ai_cache import pregenerate_analyses
+
+        pregenerate_analyses(engine, workers=settings.get("workers", 4))
+
+    if summary["failed"]:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,6 +7,7 @@ sys.path.append(str(PROJECT_ROOT))
 
 from src.pipeline import run_pipeline
 from src.db import get_engine
+from src.logger import setup_logging
 
 # =====================================================
 # DEVELOPMENT / DEBUG SCRIPT
@@ -16,6 +17,7 @@ from src.db import get_engine
 # =====================================================
 
 def main():
+    setup_logging()
     engine = get_engine()
 
     run_pipeline(
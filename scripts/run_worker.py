@@ -0,0 +1,44 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.pipeline import run_queue_worker_from_config
+from src.migrations import run_migrations
+from src.db import get_engine
+from src.logger import setup_logging
+
+# =====================================================
+# PRODUCTION SCRIPT (sharded)
+
+# Claims tickers from the ingest_queue table until it is drained. Run one
+# with --enqueue to queue config/tickers.yaml, then any number of plain
+# workers, e.g.
+#   docker compose run --rm worker python scripts/run_worker.py --enqueue
+#   docker compose up --scale worker=4 worker
+# =====================================================
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="queue the tickers of config/tickers.yaml before working",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    engine = get_engine()
+
+    run_migrations(engine)
+
+    summary = run_queue_worker_from_config(engine, enqueue=args.enqueue)
+
+    if summary["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+-- Opt-in compact storage for daily_prices (python scripts/migrate.py --compact).
+--
+-- Prices become double precision and indicators real instead of arbitrary
+-- precision NUMERIC: fixed-width on disk, faster to aggregate and decoded
+-- as floats rather than Decimal. Volume stays BIGINT, since daily share
+-- volumes on IDX tickers exceed the 2^31 range of integer.
+-- Rewrites the table (and every partition) under an exclusive lock.
+ALTER TABLE daily_prices
+    ALTER COLUMN open TYPE DOUBLE PRECISION USING open::DOUBLE PRECISION,
+    ALTER COLUMN high TYPE DOUBLE PRECISION USING high::DOUBLE PRECISION,
+    ALTER COLUMN low TYPE DOUBLE PRECISION USING low::DOUBLE PRECISION,
+    ALTER COLUMN close TYPE DOUBLE PRECISION USING close::DOUBLE PRECISION,
+    ALTER COLUMN ma_5 TYPE REAL USING ma_5::REAL,
+    ALTER COLUMN ma_20 TYPE REAL USING ma_20::REAL,
+    ALTER COLUMN ma_50 TYPE REAL USING ma_50::REAL,
+    ALTER COLUMN rsi TYPE REAL USING rsi::REAL,
+    ALTER COLUMN daily_return TYPE REAL USING daily_return::REAL;
@@ -1,4 +1,4 @@
-CREATE TABLE daily_prices (
+CREATE TABLE IF NOT EXISTS daily_prices (
     date DATE NOT NULL,
     ticker TEXT NOT NULL,
     open NUMERIC,
@@ -0,0 +1,8 @@
+-- Per-ticker data version, bumped in the same transaction as every write to
+-- daily_prices. Repository caches key their entries on it, so a new
+-- version invalidates cached series as soon as the write commits.
+CREATE TABLE IF NOT EXISTS data_versions (
+    ticker TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,19 @@
+-- Per-ticker load watermark, maintained in the same transaction as every
+-- insert into daily_prices. The pipeline plans all fetch windows from one
+-- query on it and the dashboard lists tickers without scanning daily_prices.
+CREATE TABLE IF NOT EXISTS tickers (
+    ticker TEXT PRIMARY KEY,
+    last_date DATE,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    last_run_status TEXT,
+    last_run_at TIMESTAMPTZ,
+    last_error TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Backfill for databases that already hold prices
+INSERT INTO tickers (ticker, last_date, row_count)
+SELECT ticker, MAX(date), COUNT(*)
+FROM daily_prices
+GROUP BY ticker
+ON CONFLICT (ticker) DO NOTHING;
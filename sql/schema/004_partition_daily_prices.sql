@@ -0,0 +1,84 @@
+-- Range-partition daily_prices by year, with a BRIN index on date.
+--
+-- Dashboard queries filter on ticker IN (...) AND date BETWEEN ..., so the
+-- planner prunes to the partitions of the requested years and reads them
+-- through the (ticker, date) primary key, date being its second column.
+-- The BRIN index only serves date-only scans (e.g. "all tickers since X"),
+-- and only skips blocks where rows were appended in date order: the copy
+-- below and daily incremental loads. Full-history loads write one ticker
+-- at a time, mixing a whole year's dates into every block range.
+--
+-- Old years can be archived cheaply with
+--   ALTER TABLE daily_prices DETACH PARTITION daily_prices_2000;
+-- Rows outside every yearly partition land in daily_prices_default until
+-- ensure_daily_prices_partition(year) creates their partition.
+
+CREATE OR REPLACE FUNCTION ensure_daily_prices_partition(p_year INT)
+RETURNS VOID AS $$
+DECLARE
+    part TEXT := format('daily_prices_%s', p_year);
+    lo DATE := make_date(p_year, 1, 1);
+    hi DATE := make_date(p_year + 1, 1, 1);
+BEGIN
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    -- Rows of that year parked in the default partition would block the
+    -- new partition's constraint; move them across
+    CREATE TEMP TABLE daily_prices_moving (LIKE daily_prices) ON COMMIT DROP;
+
+    WITH moved AS (
+        DELETE FROM daily_prices_default
+        WHERE date >= lo AND date < hi
+        RETURNING *
+    )
+    INSERT INTO daily_prices_moving SELECT * FROM moved;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF daily_prices FOR VALUES FROM (%L) TO (%L)',
+        part, lo, hi
+    );
+
+    INSERT INTO daily_prices SELECT * FROM daily_prices_moving ORDER BY date;
+    DROP TABLE daily_prices_moving;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    first_year INT;
+    y INT;
+BEGIN
+    -- Already partitioned (migration re-run on a fresh init volume)
+    IF (SELECT relkind FROM pg_class WHERE oid = 'daily_prices'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE daily_prices RENAME TO daily_prices_unpartitioned;
+    ALTER TABLE daily_prices_unpartitioned
+        RENAME CONSTRAINT daily_prices_pkey TO daily_prices_unpartitioned_pkey;
+
+    CREATE TABLE daily_prices (
+        LIKE daily_prices_unpartitioned INCLUDING DEFAULTS,
+        PRIMARY KEY (ticker, date)
+    ) PARTITION BY RANGE (date);
+
+    CREATE TABLE daily_prices_default PARTITION OF daily_prices DEFAULT;
+
+    SELECT LEAST(2000, COALESCE(EXTRACT(YEAR FROM MIN(date))::INT, 2000))
+    INTO first_year
+    FROM daily_prices_unpartitioned;
+
+    FOR y IN first_year .. EXTRACT(YEAR FROM now())::INT + 1 LOOP
+        PERFORM ensure_daily_prices_partition(y);
+    END LOOP;
+
+    -- Date order keeps the BRIN ranges of the copied rows narrow
+    INSERT INTO daily_prices SELECT * FROM daily_prices_unpartitioned ORDER BY date;
+    DROP TABLE daily_prices_unpartitioned;
+
+    -- Cheap to keep; skips blocks only where rows arrived in date order
+    CREATE INDEX daily_prices_date_brin ON daily_prices USING BRIN (date);
+END;
+$$;
@@ -0,0 +1,86 @@
+-- Weekly / monthly OHLCV bars with indicators computed at that granularity
+-- (ma_N = N-period average of period closes, rsi over period closes).
+-- Refreshed by the pipeline for the periods touched by each load; long
+-- dashboard ranges read these instead of daily rows. Existing prices are
+-- backfilled below (src/rollups.py rebuilds the same bars per ticker).
+CREATE TABLE IF NOT EXISTS price_rollups (
+    resolution TEXT NOT NULL,          -- 'weekly' | 'monthly'
+    ticker TEXT NOT NULL,
+    period_start DATE NOT NULL,
+    date DATE NOT NULL,                -- last trading day in the period
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION,
+    volume BIGINT,
+    ma_5 DOUBLE PRECISION,
+    ma_20 DOUBLE PRECISION,
+    ma_50 DOUBLE PRECISION,
+    rsi DOUBLE PRECISION,
+    period_return DOUBLE PRECISION,
+    PRIMARY KEY (resolution, ticker, period_start)
+);
+
+-- Backfill for databases that already hold prices: the bars, as
+-- rollups._refresh_bars builds them...
+INSERT INTO price_rollups (
+    resolution, ticker, period_start, date,
+    open, high, low, close, volume
+)
+SELECT
+    r.resolution,
+    d.ticker,
+    CAST(date_trunc(r.unit, d.date) AS DATE) AS period_start,
+    MAX(d.date),
+    (array_agg(d.open ORDER BY d.date))[1],
+    MAX(d.high),
+    MIN(d.low),
+    (array_agg(d.close ORDER BY d.date DESC))[1],
+    SUM(d.volume)
+FROM daily_prices AS d
+CROSS JOIN (VALUES ('weekly', 'week'), ('monthly', 'month')) AS r(resolution, unit)
+GROUP BY r.resolution, d.ticker, period_start
+ON CONFLICT (resolution, ticker, period_start) DO NOTHING;
+
+-- ...then their indicators, with the windows of transform.indicator_kernel:
+-- a mean is NULL until its window holds that many non-NULL closes, and
+-- RSI averages the last 14 gains/losses (a missing change counts as 0).
+WITH changes AS (
+    SELECT
+        resolution, ticker, period_start, close,
+        ROW_NUMBER() OVER s AS n,
+        LAG(close) OVER s AS prev_close,
+        COALESCE(close - LAG(close) OVER s, 0) AS change
+    FROM price_rollups
+    WINDOW s AS (PARTITION BY resolution, ticker ORDER BY period_start)
+),
+windows AS (
+    SELECT
+        resolution, ticker, period_start, n, close, prev_close,
+        AVG(close) OVER w5 AS ma_5, COUNT(close) OVER w5 AS n_5,
+        AVG(close) OVER w20 AS ma_20, COUNT(close) OVER w20 AS n_20,
+        AVG(close) OVER w50 AS ma_50, COUNT(close) OVER w50 AS n_50,
+        AVG(GREATEST(change, 0)) OVER w14 AS avg_gain,
+        AVG(GREATEST(-change, 0)) OVER w14 AS avg_loss
+    FROM changes
+    WINDOW
+        s AS (PARTITION BY resolution, ticker ORDER BY period_start),
+        w5 AS (s ROWS 4 PRECEDING),
+        w14 AS (s ROWS 13 PRECEDING),
+        w20 AS (s ROWS 19 PRECEDING),
+        w50 AS (s ROWS 49 PRECEDING)
+)
+UPDATE price_rollups AS r
+SET ma_5 = CASE WHEN w.n_5 = 5 THEN w.ma_5 END,
+    ma_20 = CASE WHEN w.n_20 = 20 THEN w.ma_20 END,
+    ma_50 = CASE WHEN w.n_50 = 50 THEN w.ma_50 END,
+    rsi = CASE
+        WHEN w.n < 14 THEN NULL
+        WHEN w.avg_loss = 0 THEN CASE WHEN w.avg_gain > 0 THEN 100 END
+        ELSE 100 - 100 / (1 + w.avg_gain / w.avg_loss)
+    END,
+    period_return = w.close / NULLIF(w.prev_close, 0) - 1
+FROM windows AS w
+WHERE r.resolution = w.resolution
+  AND r.ticker = w.ticker
+  AND r.period_start = w.period_start;
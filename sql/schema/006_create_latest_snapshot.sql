@@ -0,0 +1,49 @@
+-- Newest stored bar per ticker (plus the previous bar's close and MAs, for
+-- crossover screens), refreshed in the same transaction as every write to
+-- daily_prices. "Current state" reads and universe-wide screens hit this
+-- one-row-per-ticker table instead of daily_prices.
+CREATE TABLE IF NOT EXISTS latest_snapshot (
+    ticker TEXT PRIMARY KEY,
+    date DATE NOT NULL,
+    close DOUBLE PRECISION,
+    ma_5 DOUBLE PRECISION,
+    ma_20 DOUBLE PRECISION,
+    ma_50 DOUBLE PRECISION,
+    rsi DOUBLE PRECISION,
+    daily_return DOUBLE PRECISION,
+    prev_close DOUBLE PRECISION,
+    prev_ma_5 DOUBLE PRECISION,
+    prev_ma_20 DOUBLE PRECISION,
+    prev_ma_50 DOUBLE PRECISION,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS latest_snapshot_rsi_idx ON latest_snapshot (rsi);
+CREATE INDEX IF NOT EXISTS latest_snapshot_return_idx ON latest_snapshot (daily_return);
+CREATE INDEX IF NOT EXISTS latest_snapshot_close_idx ON latest_snapshot (close);
+CREATE INDEX IF NOT EXISTS latest_snapshot_ma_50_idx ON latest_snapshot (ma_50);
+
+-- Backfill for databases that already hold prices
+INSERT INTO latest_snapshot (
+    ticker, date, close, ma_5, ma_20, ma_50, rsi, daily_return,
+    prev_close, prev_ma_5, prev_ma_20, prev_ma_50
+)
+SELECT t.ticker, cur.date, cur.close, cur.ma_5, cur.ma_20, cur.ma_50,
+       cur.rsi, cur.daily_return,
+       prev.close, prev.ma_5, prev.ma_20, prev.ma_50
+FROM tickers AS t
+CROSS JOIN LATERAL (
+    SELECT date, close, ma_5, ma_20, ma_50, rsi, daily_return
+    FROM daily_prices AS d
+    WHERE d.ticker = t.ticker
+    ORDER BY date DESC
+    LIMIT 1
+) AS cur
+LEFT JOIN LATERAL (
+    SELECT close, ma_5, ma_20, ma_50
+    FROM daily_prices AS d
+    WHERE d.ticker = t.ticker AND d.date < cur.date
+    ORDER BY date DESC
+    LIMIT 1
+) AS prev ON TRUE
+ON CONFLICT (ticker) DO NOTHING;
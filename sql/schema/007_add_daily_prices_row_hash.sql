@@ -0,0 +1,29 @@
+-- Per-row content hash of the stored bar, so re-fetched history can be
+-- diffed against it and only revised rows rewritten (split / dividend
+-- adjustments, late corrections).
+--
+-- Prices are rounded to 6 decimals before hashing, so float noise between
+-- downloads and NUMERIC vs double precision storage hash alike.
+CREATE OR REPLACE FUNCTION price_row_hash(
+    p_open DOUBLE PRECISION,
+    p_high DOUBLE PRECISION,
+    p_low DOUBLE PRECISION,
+    p_close DOUBLE PRECISION,
+    p_volume DOUBLE PRECISION
+)
+RETURNS UUID AS $$
+    SELECT CAST(md5(CAST(ROW(
+        round(CAST(p_open AS NUMERIC), 6),
+        round(CAST(p_high AS NUMERIC), 6),
+        round(CAST(p_low AS NUMERIC), 6),
+        round(CAST(p_close AS NUMERIC), 6),
+        round(CAST(p_volume AS NUMERIC))
+    ) AS TEXT)) AS UUID)
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+ALTER TABLE daily_prices ADD COLUMN IF NOT EXISTS row_hash UUID;
+
+-- One-off backfill; rows written since carry their hash from the upsert
+UPDATE daily_prices
+SET row_hash = price_row_hash(open, high, low, close, volume)
+WHERE row_hash IS NULL;
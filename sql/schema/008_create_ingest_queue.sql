@@ -0,0 +1,19 @@
+-- Work queue for sharded ingestion: scripts/run_worker.py replicas claim
+-- tickers with FOR UPDATE SKIP LOCKED, hold them under a lease they keep
+-- extending (heartbeat) and mark them done, or pending again on failure.
+-- A running item whose lease expired (crashed worker) is claimable again.
+CREATE TABLE IF NOT EXISTS ingest_queue (
+    ticker TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',   -- pending | running | done | failed
+    attempts INT NOT NULL DEFAULT 0,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    leased_by TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    last_error TEXT,
+    enqueued_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ingest_queue_claim_idx
+    ON ingest_queue (status, available_at)
+    WHERE status IN ('pending', 'running');
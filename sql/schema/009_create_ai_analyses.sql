@@ -0,0 +1,15 @@
+-- Generated AI technical summaries, shared by every dashboard replica and
+-- kept across restarts. Keyed by the exact prompt (sha256), the prompt
+-- template version and the model, so a template or model change never
+-- serves stale text.
+CREATE TABLE IF NOT EXISTS ai_analyses (
+    prompt_hash TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    model TEXT NOT NULL,
+    ticker TEXT,
+    analysis TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (prompt_hash, prompt_version, model)
+);
+
+CREATE INDEX IF NOT EXISTS ai_analyses_ticker_idx ON ai_analyses (ticker, created_at);
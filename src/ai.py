@@ -1,6 +1,6 @@
-from openai import OpenAI
 from typing import Optional
 import os
+from env import load_environment
 from logger import get_logger
 
 logger = get_logger()
@@ -13,21 +13,30 @@ def get_openai_client():
     if _client is not None:
         return _client
 
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if not openai_configured():
         logger.warning("OPENAI_API_KEY not found in environment")
         return None
 
     try:
-        _client = OpenAI(api_key=api_key)
+        # Imported on first use; the openai package is slow to load
+        from openai import OpenAI
+
+        _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         return _client
 
     except Exception:
         logger.exception("Failed to initialize OpenAI client")
         return None
 
+def openai_configured() -> bool:
+    """Whether an API key is set, without loading the openai package."""
+    load_environment()
+    return bool(os.getenv("OPENAI_API_KEY"))
+
 PROMPT_VERSION = "v1.0"
 
+AI_MODEL = "gpt-4o-mini"
+
 def summarize_technical_state(df):
     latest = df.iloc[-1]
 
@@ -71,17 +80,15 @@ Technical data:
 {summary_text}
 """
 
-client = OpenAI()
-
-def get_ai_analysis(prompt: str) -> str:
-    client = get_openai_client()
+def get_ai_analysis(prompt: str, client=None, model: str = AI_MODEL) -> str:
+    client = client or get_openai_client()
     if client is None:
         logger.warning("OpenAI client not available (missing API key or init failure)")
         raise RuntimeError("OpenAI unavailable")
 
     try:
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=model,
             messages=[
                 {"role": "system", "content": "You are a cautious financial analyst."},
                 {"role": "user", "content": prompt},
@@ -0,0 +1,186 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from sqlalchemy import text
+
+from ai import (
+    AI_MODEL,
+    PROMPT_VERSION,
+    build_ai_prompt,
+    get_ai_analysis,
+    get_openai_client,
+    summarize_technical_state,
+)
+from logger import get_logger
+from repository import get_latest_snapshot
+
+logger = get_logger()
+
+DEFAULT_PREGENERATE_WORKERS = 4
+
+# In-process single flight: key -> (done event, result holder)
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+def build_ticker_prompt(snapshot):
+    """Prompt for one ticker's latest_snapshot row (a one-row frame)."""
+    return build_ai_prompt(summarize_technical_state(snapshot))
+
+def get_stored_analysis(prompt: str, engine, model: str = AI_MODEL):
+    with engine.connect() as conn:
+        return _read_stored(conn, prompt, model)
+
+def _read_stored(conn, prompt, model):
+    return conn.execute(text("""
+        SELECT analysis
+        FROM ai_analyses
+        WHERE prompt_hash = :hash AND prompt_version = :version AND model = :model
+    """), {
+        "hash": prompt_hash(prompt),
+        "version": PROMPT_VERSION,
+        "model": model,
+    }).scalar()
+
+def get_or_generate_analysis(prompt: str, engine, model: str = AI_MODEL, client=None, ticker=None):
+    """
+    Return the stored analysis of `prompt`, generating and storing it on a
+    miss.
+
+    Concurrent identical requests are collapsed: threads of this process
+    wait for the one generating it, and other processes wait on a
+    PostgreSQL advisory lock on the prompt key, then find it stored.
+    """
+    stored = get_stored_analysis(prompt, engine, model)
+    if stored is not None:
+        return stored
+
+    key = (prompt_hash(prompt), PROMPT_VERSION, model)
+
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _in_flight[key] = {"done": threading.Event(), "result": None, "error": None}
+
+    if not leader:
+        flight["done"].wait()
+        if flight["error"] is not None:
+            raise flight["error"]
+        return flight["result"]
+
+    try:
+        flight["result"] = _generate_locked(prompt, engine, model, client, ticker, key)
+        return flight["result"]
+    except Exception as e:
+        flight["error"] = e
+        raise
+    finally:
+        flight["done"].set()
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+
+def _generate_locked(prompt, engine, model, client, ticker, key):
+    # 64-bit advisory lock id from the cache key
+    lock_id = int.from_bytes(
+        hashlib.sha256("|".join(key).encode()).digest()[:8], "big", signed=True
+    )
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": lock_id})
+        conn.commit()
+
+        try:
+            # Another replica may have generated it while we waited. Read on
+            # the lock's own connection: holding it while checking out a
+            # second one can exhaust the pool under many workers
+            stored = _read_stored(conn, prompt, model)
+            conn.commit()
+            if stored is not None:
+                return stored
+
+            started = time.perf_counter()
+            analysis = get_ai_analysis(prompt, client=client, model=model)
+            logger.info(
+                "Generated AI analysis",
+                extra={
+                    "ticker": ticker,
+                    "model": model,
+                    "seconds": round(time.perf_counter() - started, 3),
+                },
+            )
+
+            conn.execute(text("""
+                INSERT INTO ai_analyses (prompt_hash, prompt_version, model, ticker, analysis)
+                VALUES (:hash, :version, :model, :ticker, :analysis)
+                ON CONFLICT (prompt_hash, prompt_version, model) DO NOTHING
+            """), {
+                "hash": key[0],
+                "version": key[1],
+                "model": model,
+                "ticker": ticker,
+                "analysis": analysis,
+            })
+            conn.commit()
+            return analysis
+
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+            conn.commit()
+
+def pregenerate_analyses(
+    engine,
+    tickers=None,
+    workers: int = DEFAULT_PREGENERATE_WORKERS,
+    model: str = AI_MODEL,
+    client=None,
+):
+    """
+    Generate the dashboard's AI summary of every ticker's latest bar (all
+    tickers when None) ahead of time, at most `workers` requests at once.
+    Already stored prompts cost one lookup. Returns counts.
+    """
+    if client is None and get_openai_client() is None:
+        logger.warning("OpenAI unavailable — skipping AI pre-generation")
+        return {"tickers": 0, "generated": 0, "stored": 0, "failed": {}}
+
+    started = time.perf_counter()
+    snapshot = get_latest_snapshot(engine, tickers)
+
+    prompts = {
+        ticker: build_ticker_prompt(rows)
+        for ticker, rows in snapshot.groupby("ticker", observed=True, sort=True)
+    }
+
+    result = {"tickers": len(prompts), "generated": 0, "stored": 0, "failed": {}}
+    missing = {
+        ticker: prompt
+        for ticker, prompt in prompts.items()
+        if get_stored_analysis(prompt, engine, model) is None
+    }
+    result["stored"] = len(prompts) - len(missing)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ai") as executor:
+        futures = {
+            executor.submit(get_or_generate_analysis, prompt, engine, model, client, ticker): ticker
+            for ticker, prompt in missing.items()
+        }
+        for future in as_completed(futures):
+            ticker = futures[future]
+            error = future.exception()
+            if error is None:
+                result["generated"] += 1
+            else:
+                result["failed"][ticker] = f"{type(error).__name__}: {error}"
+
+    result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"Pre-generated AI analyses: {result['generated']} generated, "
+        f"{result['stored']} already stored, {len(result['failed'])} failed "
+        f"in {result['elapsed_seconds']}s"
+    )
+    return result
@@ -0,0 +1,198 @@
+import json
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from logger import get_logger
+
+logger = get_logger()
+
+# Always resolve to project root (one level above src/)
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+# Defaults; overridden by the `raw_cache` section of config/pipeline.yaml
+_settings = {
+    "enabled": True,
+    "dir": "data/raw_bars",
+    # A cache younger than this is served without asking Yahoo for the gap
+    "max_age_hours": 12,
+    # Never call Yahoo; serve whatever is on disk
+    "offline": False,
+}
+
+METADATA_KEY = b"raw_bar_cache"
+
+def configure_raw_cache(settings: dict | None = None):
+    """Apply raw-bar cache settings (enabled, dir, max_age_hours, offline)."""
+    _settings.update(settings or {})
+
+def raw_cache_enabled() -> bool:
+    if not _settings["enabled"]:
+        return False
+
+    if not _parquet_available():
+        logger.warning("pyarrow not installed — raw bar cache disabled")
+        _settings["enabled"] = False
+        return False
+
+    return True
+
+@lru_cache(maxsize=1)
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _cache_dir() -> Path:
+    path = Path(_settings["dir"])
+    return path if path.is_absolute() else BASE_DIR / path
+
+def _cache_path(ticker: str) -> Path:
+    # Tickers like "BRK-B" or "^JKSE" stay readable; only path separators are unsafe
+    return _cache_dir() / f"{ticker.replace('/', '_')}.parquet"
+
+def read_cached_bars(ticker: str):
+    """
+    Return (bars, coverage) for a ticker, or (None, None) if nothing is cached.
+
+    coverage holds the half-open [start, end) date range that has been
+    requested from Yahoo and the UTC time of the last fetch.
+    """
+    import pyarrow.parquet as pq
+
+    path = _cache_path(ticker)
+    if not path.exists():
+        return None, None
+
+    table = pq.read_table(path)
+    meta = json.loads(table.schema.metadata[METADATA_KEY])
+
+    coverage = {
+        "start": pd.Timestamp(meta["start"]),
+        "end": pd.Timestamp(meta["end"]),
+        "fetched_at": pd.Timestamp(meta["fetched_at"]),
+    }
+    return table.to_pandas(), coverage
+
+def write_cached_bars(ticker: str, bars: pd.DataFrame, coverage: dict):
+    """Atomically replace the cached bars and coverage for a ticker."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = _cache_path(ticker)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    table = pa.Table.from_pandas(bars, preserve_index=False)
+    meta = {
+        "start": coverage["start"].isoformat(),
+        "end": coverage["end"].isoformat(),
+        "fetched_at": coverage["fetched_at"].isoformat(),
+    }
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        METADATA_KEY: json.dumps(meta).encode(),
+    })
+
+    tmp_path = path.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+def fetch_with_cache(ticker: str, start, end, download, refresh_from=None):
+    """
+    Serve [start, end) for a ticker from the cache, calling
+    download(ticker, start, end) only for the uncovered gaps.
+
+    refresh_from pulls the start of the trailing gap back to that date, so
+    recent cached bars are re-downloaded (to pick up revisions) whenever
+    the trailing gap is fetched.
+
+    Fetched gaps are merged into the cached bars (newer rows win) so the
+    cache keeps one contiguous covered range per ticker. The last day
+    covered by a fetch is treated as incomplete and re-requested next time.
+    A gap that downloads empty (Yahoo answers most errors with an empty
+    frame) is left uncovered, so it is requested again next time.
+    """
+    today = pd.Timestamp.today().normalize()
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize() if end is not None else today + pd.Timedelta(days=1)
+
+    cached, coverage = read_cached_bars(ticker)
+
+    if cached is None:
+        gaps = [(start, end)]
+    else:
+        gaps = []
+        if start < coverage["start"]:
+            gaps.append((start, coverage["start"]))
+
+        # The trailing gap only opens once the cache is older than max_age_hours,
+        # unless the cache stops short of its fetch day (a chunked backfill)
+        age = pd.Timestamp.now(tz="UTC") - coverage["fetched_at"]
+        reached_fetch_day = coverage["end"] >= coverage["fetched_at"].tz_convert(None).normalize()
+        if end > coverage["end"]:
+            if age < pd.Timedelta(hours=_settings["max_age_hours"]) and reached_fetch_day:
+                logger.info("Raw bar cache for %s is fresh — not refetching recent bars", ticker)
+            else:
+                trailing_start = coverage["end"]
+                if refresh_from is not None:
+                    refresh_start = pd.Timestamp(refresh_from).normalize()
+                    trailing_start = max(coverage["start"], min(trailing_start, refresh_start))
+                gaps.append((trailing_start, end))
+
+    if gaps and _settings["offline"]:
+        logger.warning("Offline mode — serving cached bars only for %s", ticker)
+        gaps = []
+
+    if gaps:
+        frames = [] if cached is None else [cached]
+        fetched = []
+        for gap_start, gap_end in gaps:
+            logger.info("Raw bar cache miss for %s: %s → %s", ticker, gap_start.date(), gap_end.date())
+            bars = download(ticker, gap_start, gap_end)
+
+            if bars.empty:
+                logger.warning(
+                    "Empty download for %s: %s → %s — range left uncached",
+                    ticker, gap_start.date(), gap_end.date(),
+                    extra={"ticker": ticker},
+                )
+                continue
+
+            frames.append(bars)
+            fetched.append((gap_start, gap_end))
+
+        if fetched:
+            merged = (
+                pd.concat(frames, ignore_index=True)
+                  .drop_duplicates(subset=["date", "ticker"], keep="last")
+                  .sort_values("date", ignore_index=True)
+            )
+
+            # Coverage only grows by the gaps that returned bars
+            bounds = [b for gap in fetched for b in gap]
+            if coverage is not None:
+                bounds += [coverage["start"], coverage["end"]]
+            new_start, new_end = min(bounds), max(bounds)
+
+            # Only a fetch past the covered end makes the recent bars fresh
+            refreshed = coverage is None or any(gap_end > coverage["end"] for _, gap_end in fetched)
+
+            write_cached_bars(ticker, merged, {
+                "start": new_start,
+                "end": min(new_end, today),
+                "fetched_at": (
+                    pd.Timestamp(datetime.now(timezone.utc)) if refreshed else coverage["fetched_at"]
+                ),
+            })
+            cached = merged
+
+    if cached is None or cached.empty:
+        return pd.DataFrame()
+
+    dates = pd.to_datetime(cached["date"])
+    return cached[(dates >= start) & (dates < end)].reset_index(drop=True)
@@ -1,17 +1,13 @@
+import io
 import os
 import pandas as pd
-from dotenv import load_dotenv
 from functools import lru_cache
-from sqlalchemy import create_engine, text, Table, MetaData
+from sqlalchemy import create_engine, text, Table, MetaData, Integer, bindparam
 from sqlalchemy.dialects.postgresql import insert
 
+from env import load_environment
 from logger import get_logger
-
-# ========================
-# Application Bootstrap
-# ========================
-
-load_dotenv()
+from metrics import timed
 
 logger = get_logger()
 
@@ -21,31 +17,345 @@ logger = get_logger()
 
 @lru_cache
 def get_engine():
+    load_environment()
+
     return create_engine(
-        f"postgresql://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
+        f"postgresql+psycopg2://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
         f"@{os.getenv('POSTGRES_HOST')}:"
         f"{os.getenv('POSTGRES_PORT')}/"
-        f"{os.getenv('POSTGRES_DB')}"
+        f"{os.getenv('POSTGRES_DB')}",
+        pool_size=int(os.getenv("POSTGRES_POOL_SIZE", "5")),
     )
 
 # ========================
 # Persistence
 # ========================
 
-def upsert_prices(df: pd.DataFrame, engine, table_name="daily_prices"):
-    logger.info(f"Inserting {len(df)} rows into daily_prices")
-    metadata = MetaData()
-    table = Table(table_name, metadata, autoload_with=engine)
+# Rows per COPY chunk; bounds the CSV buffer held in memory
+COPY_CHUNK_ROWS = 50_000
+
+@lru_cache(maxsize=None)
+def get_table(engine, table_name="daily_prices"):
+    """Reflect a table once per engine instead of on every write."""
+    return Table(table_name, MetaData(), autoload_with=engine)
+
+def upsert_prices(df: pd.DataFrame, engine, table_name="daily_prices", method="copy"):
+    """
+    Insert rows that are not stored yet and return the insert/skip counts.
+
+    method="copy" streams the frame through COPY into a temporary staging
+    table and merges it with one INSERT ... SELECT; method="insert" is the
+    original single multi-VALUES statement, kept for comparison.
+    """
+    logger.info("Inserting %d rows into %s", len(df), table_name)
+
+    if df.empty:
+        return {"inserted": 0, "skipped": 0}
+
+    table = get_table(engine, table_name)
+
+    with timed("upsert") as m:
+        if method == "copy":
+            inserted = _copy_upsert(df, engine, table)
+        elif method == "insert":
+            inserted = _insert_upsert(df, engine, table)
+        else:
+            raise ValueError(f"Unknown upsert method: {method}")
 
+        m.rows = len(df)
+        m.bytes = int(df.memory_usage(deep=True).sum())
+
+    result = {"inserted": inserted, "skipped": len(df) - inserted}
+    logger.info(
+        "Upserted into %s: %d inserted, %d skipped",
+        table_name, result["inserted"], result["skipped"],
+    )
+    return result
+
+# Columns covered by the row hash, plus the key
+PRICE_COLUMNS = ["ticker", "date", "open", "high", "low", "close", "volume"]
+
+# Content hash of a price row; see sql/schema/007_add_daily_prices_row_hash.sql
+_ROW_HASH_SQL = (
+    "price_row_hash({prefix}open, {prefix}high, {prefix}low, "
+    "{prefix}close, {prefix}volume)"
+)
+
+# Advances ticker watermarks from a (ticker, date) row source of inserted rows
+_ADVANCE_WATERMARKS_SQL = """
+    INSERT INTO tickers (ticker, last_date, row_count)
+    SELECT ticker, MAX(date), COUNT(*)
+    FROM {source}
+    GROUP BY ticker
+    ON CONFLICT (ticker) DO UPDATE
+    SET last_date = GREATEST(tickers.last_date, EXCLUDED.last_date),
+        row_count = tickers.row_count + EXCLUDED.row_count,
+        updated_at = now()
+"""
+
+# Bumps the data version of every ticker in a row source
+_BUMP_VERSIONS_SQL = """
+    INSERT INTO data_versions (ticker)
+    SELECT DISTINCT ticker FROM {source}
+    ON CONFLICT (ticker) DO UPDATE
+    SET version = data_versions.version + 1,
+        updated_at = now()
+"""
+
+# Only the real price table feeds tickers, data_versions and latest_snapshot;
+# scratch copies (benchmarks, tests) must leave them alone
+PRICES_TABLE = "daily_prices"
+
+# Rebuilds latest_snapshot rows of every ticker in a row source from the
+# last two stored bars; run after the write it follows is visible
+_REFRESH_SNAPSHOT_SQL = """
+    INSERT INTO latest_snapshot (
+        ticker, date, close, ma_5, ma_20, ma_50, rsi, daily_return,
+        prev_close, prev_ma_5, prev_ma_20, prev_ma_50
+    )
+    SELECT t.ticker, cur.date, cur.close, cur.ma_5, cur.ma_20, cur.ma_50,
+           cur.rsi, cur.daily_return,
+           prev.close, prev.ma_5, prev.ma_20, prev.ma_50
+    FROM (SELECT DISTINCT ticker FROM {source}) AS t
+    CROSS JOIN LATERAL (
+        SELECT date, close, ma_5, ma_20, ma_50, rsi, daily_return
+        FROM daily_prices AS d
+        WHERE d.ticker = t.ticker
+        ORDER BY date DESC
+        LIMIT 1
+    ) AS cur
+    LEFT JOIN LATERAL (
+        SELECT close, ma_5, ma_20, ma_50
+        FROM daily_prices AS d
+        WHERE d.ticker = t.ticker AND d.date < cur.date
+        ORDER BY date DESC
+        LIMIT 1
+    ) AS prev ON TRUE
+    ON CONFLICT (ticker) DO UPDATE
+    SET date = EXCLUDED.date,
+        close = EXCLUDED.close,
+        ma_5 = EXCLUDED.ma_5,
+        ma_20 = EXCLUDED.ma_20,
+        ma_50 = EXCLUDED.ma_50,
+        rsi = EXCLUDED.rsi,
+        daily_return = EXCLUDED.daily_return,
+        prev_close = EXCLUDED.prev_close,
+        prev_ma_5 = EXCLUDED.prev_ma_5,
+        prev_ma_20 = EXCLUDED.prev_ma_20,
+        prev_ma_50 = EXCLUDED.prev_ma_50,
+        updated_at = now()
+"""
+
+def _insert_upsert(df, engine, table):
     records = df.to_dict(orient="records")
 
     stmt = insert(table).values(records)
     stmt = stmt.on_conflict_do_nothing(
         index_elements=["ticker", "date"]
+    ).returning(table.c.ticker, table.c.date)
+
+    with engine.begin() as conn:
+        rows = conn.execute(stmt).fetchall()
+        if rows and table.name == PRICES_TABLE:
+            source = (
+                "unnest(CAST(:tickers AS TEXT[]), CAST(:dates AS DATE[])) "
+                "AS inserted(ticker, date)"
+            )
+            params = {
+                "tickers": [r.ticker for r in rows],
+                "dates": [r.date for r in rows],
+            }
+            conn.execute(text(_ADVANCE_WATERMARKS_SQL.format(source=source)), params)
+            bump_data_versions(conn, {r.ticker for r in rows})
+            conn.execute(
+                text(_REFRESH_SNAPSHOT_SQL.format(
+                    source="unnest(CAST(:tickers AS TEXT[])) AS refreshed(ticker)"
+                )),
+                {"tickers": list({r.ticker for r in rows})},
+            )
+        return len(rows)
+
+def bump_data_versions(conn, tickers):
+    """Bump the data version of tickers inside the caller's transaction."""
+    conn.execute(
+        text(_BUMP_VERSIONS_SQL.format(
+            source="unnest(CAST(:tickers AS TEXT[])) AS bumped(ticker)"
+        )),
+        {"tickers": list(tickers)},
+    )
+
+def _copy_into(conn, df, table, target, columns):
+    """COPY `columns` of df into `target` in bounded CSV chunks."""
+    df = df[columns]
+
+    # CSV has no integer/float distinction; keep BIGINT columns integral
+    for c in table.columns:
+        if c.name in columns and isinstance(c.type, Integer):
+            df = df.assign(**{c.name: pd.to_numeric(df[c.name]).round().astype("Int64")})
+
+    column_list = ", ".join(columns)
+
+    cursor = conn.connection.cursor()
+    try:
+        for start in range(0, len(df), COPY_CHUNK_ROWS):
+            buffer = io.StringIO()
+            df.iloc[start:start + COPY_CHUNK_ROWS].to_csv(
+                buffer, index=False, header=False
+            )
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {target} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+    finally:
+        cursor.close()
+
+def _create_staging(conn, table):
+    staging = f"{table.name}_staging"
+    conn.exec_driver_sql(
+        f"CREATE TEMP TABLE {staging} "
+        f"(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DROP"
+    )
+    return staging
+
+def _copy_upsert(df, engine, table):
+    columns = [c.name for c in table.columns if c.name in df.columns]
+    column_list = ", ".join(columns)
+    select_list = column_list
+
+    if "row_hash" in table.columns:
+        column_list += ", row_hash"
+        select_list += f", {_ROW_HASH_SQL.format(prefix='')}"
+
+    tracked = table.name == PRICES_TABLE
+    side_effects = (
+        f""",
+            watermarks AS ({_ADVANCE_WATERMARKS_SQL.format(source="inserted")}),
+            versions AS ({_BUMP_VERSIONS_SQL.format(source="inserted")})"""
+        if tracked else ""
     )
 
     with engine.begin() as conn:
-        conn.execute(stmt)
+        staging = _create_staging(conn, table)
+        _copy_into(conn, df, table, staging, columns)
+
+        # Merge, advance watermarks and bump versions in one statement
+        result = conn.exec_driver_sql(f"""
+            WITH inserted AS (
+                INSERT INTO {table.name} ({column_list})
+                SELECT {select_list} FROM {staging}
+                ON CONFLICT (ticker, date) DO NOTHING
+                RETURNING ticker, date
+            ){side_effects}
+            SELECT COUNT(*) FROM inserted
+        """)
+        inserted = result.scalar()
+
+        # A separate statement: CTE siblings cannot see the inserted rows
+        if inserted and tracked:
+            conn.exec_driver_sql(_REFRESH_SNAPSHOT_SQL.format(source=staging))
+
+        return inserted
+
+def revise_prices(df: pd.DataFrame, engine, table_name="daily_prices"):
+    """
+    Rewrite stored rows whose content differs from the re-fetched `df`.
+
+    Incoming rows are hashed with price_row_hash and compared to the stored
+    row_hash; only rows that changed are updated (rows not stored yet are
+    ignored). Returns {"revised": count, "since": earliest revised date or
+    None}. Indicators of the revised rows are left for the caller to
+    recompute.
+    """
+    table = get_table(engine, table_name)
+
+    if df.empty or "row_hash" not in table.columns:
+        return {"revised": 0, "since": None}
+
+    columns = [c for c in PRICE_COLUMNS if c in df.columns and c in table.columns]
+    assignments = ", ".join(f"{c} = s.{c}" for c in columns if c not in ("ticker", "date"))
+    incoming_hash = _ROW_HASH_SQL.format(prefix="s.")
+
+    tracked = table.name == PRICES_TABLE
+    versions = (
+        f""",
+            versions AS ({_BUMP_VERSIONS_SQL.format(source="revised")})"""
+        if tracked else ""
+    )
+
+    with timed("revise") as m, engine.begin() as conn:
+        m.rows = len(df)
+
+        staging = _create_staging(conn, table)
+        _copy_into(conn, df, table, staging, columns)
+
+        revised, since = conn.exec_driver_sql(f"""
+            WITH revised AS (
+                UPDATE {table.name} AS t
+                SET {assignments}, row_hash = {incoming_hash}
+                FROM {staging} AS s
+                WHERE t.ticker = s.ticker
+                  AND t.date = s.date
+                  AND t.row_hash IS DISTINCT FROM {incoming_hash}
+                RETURNING t.ticker, t.date
+            ){versions}
+            SELECT COUNT(*), MIN(date) FROM revised
+        """).one()
+
+        if revised and tracked:
+            conn.exec_driver_sql(_REFRESH_SNAPSHOT_SQL.format(source=staging))
+
+    if revised:
+        logger.info("Revised %d rows of %s from %s", revised, table_name, since)
+
+    return {"revised": revised, "since": since}
+
+def update_indicators(df: pd.DataFrame, engine, columns, table_name="daily_prices"):
+    """
+    Overwrite `columns` of already stored (ticker, date) rows in bulk and
+    return the number of rows updated.
+
+    Rows go through the same COPY staging path as upsert_prices and are
+    applied with one UPDATE ... FROM join.
+    """
+    table = get_table(engine, table_name)
+    columns = [c for c in columns if c in table.columns]
+
+    if df.empty or not columns:
+        return 0
+
+    assignments = ", ".join(f"{c} = s.{c}" for c in columns)
+
+    with timed("update_indicators") as m, engine.begin() as conn:
+        m.rows = len(df)
+
+        staging = _create_staging(conn, table)
+        _copy_into(conn, df, table, staging, ["ticker", "date", *columns])
+
+        result = conn.exec_driver_sql(
+            f"UPDATE {table.name} AS t SET {assignments} "
+            f"FROM {staging} AS s "
+            f"WHERE t.ticker = s.ticker AND t.date = s.date"
+        )
+        if result.rowcount and table.name == PRICES_TABLE:
+            conn.exec_driver_sql(_BUMP_VERSIONS_SQL.format(source=staging))
+            conn.exec_driver_sql(_REFRESH_SNAPSHOT_SQL.format(source=staging))
+
+    logger.info("Updated %s on %d rows of %s", ", ".join(columns), result.rowcount, table_name)
+    return result.rowcount
+
+def get_close_panel(tickers, engine):
+    """Load the stored (ticker, date, close) history of many tickers as one long frame."""
+    query = text("""
+        SELECT ticker, date, close::double precision AS close
+        FROM daily_prices
+        WHERE ticker IN :tickers
+        ORDER BY ticker, date
+    """).bindparams(bindparam("tickers", expanding=True))
+
+    with engine.connect() as conn:
+        result = conn.execute(query, {"tickers": list(tickers)})
+        return pd.DataFrame(result.fetchall(), columns=["ticker", "date", "close"])
 
 def get_latest_date(ticker: str, engine):
     query = text("""
@@ -57,4 +367,84 @@ def get_latest_date(ticker: str, engine):
         result = conn.execute(query, {"ticker": ticker}).scalar()
     return result
 
+def get_price_tail(ticker: str, engine, rows: int):
+    """Return the last `rows` stored (date, close) rows for a ticker, oldest first."""
+    query = text("""
+        SELECT date, close
+        FROM daily_prices
+        WHERE ticker = :ticker
+        ORDER BY date DESC
+        LIMIT :rows
+    """)
+    with engine.connect() as conn:
+        result = conn.execute(query, {"ticker": ticker, "rows": rows})
+        df = pd.DataFrame(result.fetchall(), columns=["date", "close"])
+    return df.iloc[::-1].reset_index(drop=True)
+
+def get_price_history(ticker: str, engine, since, lookback_rows: int):
+    """
+    Return stored (date, close) rows of a ticker from `since` on, preceded
+    by the `lookback_rows` rows before it, oldest first.
+    """
+    query = text("""
+        SELECT date, close FROM (
+            (
+                SELECT date, close
+                FROM daily_prices
+                WHERE ticker = :ticker AND date < :since
+                ORDER BY date DESC
+                LIMIT :rows
+            )
+            UNION ALL
+            (
+                SELECT date, close
+                FROM daily_prices
+                WHERE ticker = :ticker AND date >= :since
+            )
+        ) AS history
+        ORDER BY date
+    """)
+    with engine.connect() as conn:
+        result = conn.execute(query, {"ticker": ticker, "since": since, "rows": lookback_rows})
+        return pd.DataFrame(result.fetchall(), columns=["date", "close"])
+
+def get_watermarks(tickers, engine):
+    """Return {ticker: last stored date} for tickers with data, in one query."""
+    query = text("""
+        SELECT ticker, last_date
+        FROM tickers
+        WHERE ticker = ANY(:tickers)
+          AND last_date IS NOT NULL
+    """)
+    with engine.connect() as conn:
+        result = conn.execute(query, {"tickers": list(tickers)})
+        return dict(result.fetchall())
+
+def record_run_status(results, engine):
+    """
+    Store the last run status of many tickers in one statement.
+
+    results maps ticker -> error message, or None on success.
+    """
+    if not results:
+        return
 
+    query = text("""
+        INSERT INTO tickers (ticker, last_run_status, last_run_at, last_error)
+        SELECT ticker, status, now(), error
+        FROM unnest(
+            CAST(:tickers AS TEXT[]),
+            CAST(:statuses AS TEXT[]),
+            CAST(:errors AS TEXT[])
+        ) AS run(ticker, status, error)
+        ON CONFLICT (ticker) DO UPDATE
+        SET last_run_status = EXCLUDED.last_run_status,
+            last_run_at = EXCLUDED.last_run_at,
+            last_error = EXCLUDED.last_error
+    """)
+    with engine.begin() as conn:
+        conn.execute(query, {
+            "tickers": list(results),
+            "statuses": ["failed" if e else "succeeded" for e in results.values()],
+            "errors": list(results.values()),
+        })
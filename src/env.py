@@ -0,0 +1,16 @@
+from functools import lru_cache
+from pathlib import Path
+
+# Always resolve to project root (one level above src/)
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+@lru_cache
+def load_environment():
+    """
+    Load the project .env into os.environ (once; variables already set
+    win). Called by whatever first needs configuration, not at import.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
+    return True
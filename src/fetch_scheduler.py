@@ -0,0 +1,214 @@
+import random
+import sys
+import threading
+import time
+
+from logger import get_logger
+
+logger = get_logger()
+
+# Defaults; overridden by the `fetch` section of config/pipeline.yaml
+_settings = {
+    # Sustained request rate and the burst allowed on top of it
+    "rate_per_second": 2.0,
+    "burst": 5,
+    # Calls in flight: starts at `concurrency`, moves between the bounds
+    "concurrency": 4,
+    "min_concurrency": 1,
+    "max_concurrency": 16,
+    # Attempts per call, and the exponential backoff between them (seconds)
+    "max_attempts": 5,
+    "backoff_base": 1.0,
+    "backoff_max": 60.0,
+}
+
+# Errors worth a retry besides the builtin ConnectionError/TimeoutError:
+# rate limiting and the HTTP clients' network errors. Looked up in
+# sys.modules, so classifying an error never imports a client library.
+_TRANSIENT_ERRORS = {
+    "yfinance.exceptions": ("YFRateLimitError",),
+    "requests.exceptions": ("ConnectionError", "Timeout"),
+    "curl_cffi.requests.exceptions": ("ConnectionError", "Timeout"),
+}
+
+def is_transient_error(error: BaseException) -> bool:
+    """Rate limiting or a network failure, which a later attempt may not hit."""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+
+    for module_name, names in _TRANSIENT_ERRORS.items():
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        types = tuple(getattr(module, name) for name in names if hasattr(module, name))
+        if types and isinstance(error, types):
+            return True
+
+    return False
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, at most `burst` saved."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on calls in flight: +1 after a full window of successes
+    (`limit` in a row), halved on failure at most once per `cooldown`
+    seconds, so a burst of errors counts as one congestion signal.
+    release(ok=None) frees the slot without counting either way.
+    """
+
+    def __init__(self, initial, minimum, maximum, cooldown=1.0):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.limit = min(max(int(initial), self.minimum), self.maximum)
+        self.cooldown = cooldown
+        self._in_flight = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, ok: bool | None):
+        with self._cond:
+            self._in_flight -= 1
+
+            if ok:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._successes = 0
+            elif ok is not None:
+                self._successes = 0
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown and self.limit > self.minimum:
+                    self.limit = max(self.minimum, self.limit // 2)
+                    self._last_decrease = now
+                    logger.warning("Upstream errors — fetch concurrency cut to %d", self.limit)
+
+            self._cond.notify_all()
+
+class FetchScheduler:
+    """
+    Runs upstream calls under a token-bucket rate limit and an adaptive
+    concurrency limit. Transient failures (is_transient_error) are retried
+    with jittered exponential backoff and shrink the concurrency limit;
+    any other error is raised at once.
+    """
+
+    def __init__(
+        self,
+        rate_per_second=2.0,
+        burst=5,
+        concurrency=4,
+        min_concurrency=1,
+        max_concurrency=16,
+        max_attempts=5,
+        backoff_base=1.0,
+        backoff_max=60.0,
+    ):
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.concurrency = AdaptiveConcurrency(concurrency, min_concurrency, max_concurrency)
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._counts = {"calls": 0, "attempts": 0, "retries": 0, "failures": 0}
+        self._lock = threading.Lock()
+
+    def call(self, fn, *args, ticker: str | None = None, **kwargs):
+        """
+        Call fn(*args, **kwargs). A transient error is raised once attempts
+        run out, any other error on the first attempt. `ticker` only tags
+        the retry log records.
+        """
+        self._count("calls")
+
+        for attempt in range(self.max_attempts):
+            self.bucket.acquire()
+            self.concurrency.acquire()
+            self._count("attempts")
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_transient_error(e):
+                    # Not a congestion signal: free the slot and give up
+                    self.concurrency.release(ok=None)
+                    self._count("failures")
+                    raise
+
+                self.concurrency.release(ok=False)
+
+                if attempt + 1 == self.max_attempts:
+                    self._count("failures")
+                    raise
+
+                delay = self.backoff_delay(attempt)
+                self._count("retries")
+                logger.warning(
+                    "Fetch attempt %d/%d failed (%s: %s); retrying in %.1fs",
+                    attempt + 1, self.max_attempts, type(e).__name__, e, delay,
+                    extra={"ticker": ticker} if ticker else None,
+                )
+                time.sleep(delay)
+            else:
+                self.concurrency.release(ok=True)
+                return result
+
+    def backoff_delay(self, attempt):
+        """Full-jitter exponential backoff: uniform in [0, min(max, base * 2^attempt)]."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def stats(self):
+        with self._lock:
+            return {**self._counts, "concurrency_limit": self.concurrency.limit}
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def configure_fetch_scheduler(settings: dict | None = None):
+    """Apply fetch scheduler settings and start a fresh scheduler with them."""
+    global _scheduler
+
+    with _scheduler_lock:
+        _settings.update(settings or {})
+        _scheduler = FetchScheduler(**_settings)
+
+def get_fetch_scheduler() -> FetchScheduler:
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FetchScheduler(**_settings)
+        return _scheduler
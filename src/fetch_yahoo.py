@@ -1,21 +1,62 @@
-import yfinance as yf
 import pandas as pd
+from bar_cache import raw_cache_enabled, fetch_with_cache
+from fetch_scheduler import get_fetch_scheduler
 from logger import get_logger
+from metrics import timed
 
 logger = get_logger()
 
-def fetch_daily_prices(ticker: str, start: str, end: str | None = None) -> pd.DataFrame:
-    logger.info(f"Fetching data for {ticker}")
-    df = yf.download(ticker, start=start, end=end)
+def fetch_daily_prices(
+    ticker: str, start: str, end: str | None = None, refresh_from=None
+) -> pd.DataFrame:
+    """
+    refresh_from: bars from this date on are re-downloaded rather than
+    served from the raw bar cache (when the cache refetches at all).
+    """
+    with timed("fetch") as m:
+        if raw_cache_enabled():
+            df = fetch_with_cache(
+                ticker, start, end, download=_download_daily_prices, refresh_from=refresh_from
+            )
+        else:
+            df = _download_daily_prices(ticker, start, end)
+
+        m.rows = len(df)
+        m.bytes = int(df.memory_usage(deep=True).sum())
+
+    return df
+
+def _download_daily_prices(ticker: str, start, end=None) -> pd.DataFrame:
+    logger.info("Fetching data for %s", ticker, extra={"ticker": ticker})
+    with timed("download") as m:
+        df = get_fetch_scheduler().call(_request_history, ticker, start, end, ticker=ticker)
+        m.rows = len(df)
 
     if df.empty:
-        logger.warning(f"No data returned for {ticker}")
+        logger.warning("No data returned for %s", ticker, extra={"ticker": ticker})
 
     df.reset_index(inplace=True)
     df["ticker"] = ticker
-    df.columns = df.columns.droplevel(1)
     df.columns = [c.lower() for c in df.columns]
     df = df.drop_duplicates(subset=["date", "ticker"])
     return df
 
+def _request_history(ticker, start, end):
+    # Same request as yf.download(ticker), but thread-safe: yf.download
+    # collects results in module-global state (yfinance.shared._DFS), so
+    # concurrent calls from the pipeline's worker threads can return or
+    # clobber each other's frames. Ticker.history returns its own frame,
+    # and rate limiting surfaces as YFRateLimitError instead of being
+    # logged away, so it can be retried.
+    import yfinance as yf  # loaded on first fetch; slow to import
 
+    df = yf.Ticker(ticker).history(
+        start=start, end=end, auto_adjust=True, actions=False
+    )
+
+    # yf.download's default: exchange-local dates without the timezone
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+
+    df.index.name = "Date"
+    return df
@@ -1,44 +1,189 @@
 # src/logger.py
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
+from env import load_environment
+
 # Always resolve to project root (one level above src/)
 BASE_DIR = Path(__file__).resolve().parents[1]
 
 LOG_DIR = BASE_DIR / "logs"
-LOG_DIR.mkdir(exist_ok=True)
 
 LOG_FILE = LOG_DIR / "pipeline.log"
 
-def get_logger(name: str = "yfinance_pipeline") -> logging.Logger:
+# Attributes of every LogRecord; anything else was passed with extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# Background writers of the async mode, by logger name
+_listeners = {}
+
+def _extras(record):
+    return {
+        key: value
+        for key, value in record.__dict__.items()
+        if key not in _RECORD_ATTRS and not key.startswith("_")
+    }
+
+class ExtraFormatter(logging.Formatter):
+    """The usual line, followed by the record's extra= fields as key=value."""
+
+    def formatMessage(self, record):
+        line = super().formatMessage(record)
+
+        extras = [f"{key}={value}" for key, value in _extras(record).items()]
+        if extras:
+            line += " | " + " ".join(extras)
+
+        return line
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, extra= fields, traceback."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+            **_extras(record),
+        }
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+
+        return json.dumps(entry, default=str)
+
+class _QueueHandler(QueueHandler):
+    """
+    Hands records to the background writer. Only the message (and any
+    traceback) is rendered on the calling thread; timestamps, formatting
+    and I/O happen on the writer.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+LOGGER_NAME = "yfinance_pipeline"
+
+def get_logger(name: str = LOGGER_NAME) -> logging.Logger:
+    """
+    The named logger, without side effects: modules call this at import
+    time, entry points call setup_logging() once to attach the handlers.
+    """
+    return logging.getLogger(name)
+
+def setup_logging(
+    name: str = LOGGER_NAME,
+    level=None,
+    json_format: bool | None = None,
+    async_mode: bool | None = None,
+    log_file=LOG_FILE,
+    console: bool = True,
+) -> logging.Logger:
+    """
+    Attach the console and rotating file handlers (once per process).
+
+    Unset arguments come from the environment: LOG_LEVEL (INFO),
+    LOG_FORMAT=json for JSON lines instead of text, and LOG_ASYNC=0 to
+    write on the calling thread instead of through a queue drained by a
+    background writer.
+    """
     logger = logging.getLogger(name)
 
     # Prevent duplicate handlers (VERY important)
     if logger.handlers:
         return logger
 
-    logger.setLevel(logging.INFO)
+    load_environment()
+
+    if level is None:
+        level = os.getenv("LOG_LEVEL", "INFO").upper()
+    if json_format is None:
+        json_format = os.getenv("LOG_FORMAT", "text").lower() == "json"
+    if async_mode is None:
+        async_mode = os.getenv("LOG_ASYNC", "1") not in ("0", "false", "no")
+
+    logger.setLevel(level)
 
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
-    )
+    if json_format:
+        formatter = JsonFormatter()
+    else:
+        formatter = ExtraFormatter(
+            "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
+        )
+
+    handlers = []
 
     # Console handler (notebook + script)
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
 
     # File handler (persistent logs)
-    file_handler = RotatingFileHandler(
-        LOG_FILE,
-        maxBytes=5_000_000,
-        backupCount=5
-    )
-    file_handler.setFormatter(formatter)
+    if log_file is not None:
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=5_000_000,
+            backupCount=5,
+            delay=True,
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    if async_mode:
+        records = queue.SimpleQueue()
+        listener = QueueListener(records, *handlers, respect_handler_level=True)
+        listener.start()
+
+        # Drain at exit; once per name, however often it is set up again
+        if name not in _listeners:
+            atexit.register(shutdown_logging, name)
+        _listeners[name] = listener
 
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+        logger.addHandler(_QueueHandler(records))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
 
     # to verify logs destination
-    # logger.info(f"Log file path resolved to: {LOG_FILE}")
+    # logger.info(f"Log file path resolved to: {log_file}")
     return logger
+
+def shutdown_logging(name: str = LOGGER_NAME):
+    """Drain the async queue, then detach and close the handlers."""
+    listener = _listeners.get(name)
+    if listener is not None:
+        listener.stop()
+        handlers = list(listener.handlers)
+        # Keep the key: the atexit hook for this name is already registered
+        _listeners[name] = None
+    else:
+        handlers = []
+
+    logger = logging.getLogger(name)
+    for handler in list(logger.handlers) + handlers:
+        logger.removeHandler(handler)
+        handler.close()
@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from logger import get_logger
+
+logger = get_logger()
+
+# Always resolve to project root (one level above src/)
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+PREFIX = "yfp"
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_server = None
+
+class _Measurement:
+    """Filled in by the caller of timed(): rows and bytes handled."""
+
+    __slots__ = ("rows", "bytes")
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+
+def record(stage: str, seconds: float, rows: int = 0, nbytes: int = 0):
+    """Add one call of `stage` taking `seconds` and handling rows/bytes."""
+    with _lock:
+        stats = _stages.setdefault(stage, {
+            "calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "bytes": 0,
+        })
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        stats["rows"] += int(rows)
+        stats["bytes"] += int(nbytes)
+
+@contextmanager
+def timed(stage: str):
+    """
+    Time a block as one call of `stage`:
+
+        with timed("upsert") as m:
+            m.rows = ...
+
+    Calls that raise are recorded too, and counted in <stage>_errors.
+    """
+    measurement = _Measurement()
+    started = time.perf_counter()
+    try:
+        yield measurement
+    except Exception:
+        count(f"{stage}_errors")
+        raise
+    finally:
+        record(stage, time.perf_counter() - started, measurement.rows, measurement.bytes)
+
+def count(name: str, value: int = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def snapshot() -> dict:
+    """Current metrics as plain data (JSON-serializable)."""
+    with _lock:
+        stages = {
+            stage: {
+                **stats,
+                "seconds": round(stats["seconds"], 6),
+                "max_seconds": round(stats["max_seconds"], 6),
+                "rows_per_second": round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] else 0.0,
+            }
+            for stage, stats in sorted(_stages.items())
+        }
+        return {"stages": stages, "counters": dict(sorted(_counters.items()))}
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+def render_prometheus() -> str:
+    """Metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = []
+
+    families = (
+        ("stage_seconds", "summary", "Time spent per pipeline stage call", None),
+        ("stage_seconds_max", "gauge", "Slowest call per stage", "max_seconds"),
+        ("stage_rows_total", "counter", "Rows handled per stage", "rows"),
+        ("stage_bytes_total", "counter", "Bytes handled per stage", "bytes"),
+    )
+    for family, kind, help_text, field in families:
+        name = f"{PREFIX}_{family}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for stage, stats in data["stages"].items():
+            label = f'{{stage="{stage}"}}'
+            if field is None:
+                lines.append(f"{name}_count{label} {stats['calls']}")
+                lines.append(f"{name}_sum{label} {stats['seconds']}")
+            else:
+                lines.append(f"{name}{label} {stats[field]}")
+
+    for counter, value in data["counters"].items():
+        name = f"{PREFIX}_{counter}_total"
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value}")
+
+    return "\n".join(lines) + "\n"
+
+def _resolve(path) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() else BASE_DIR / path
+
+def write_prometheus(path):
+    """
+    Write the metrics for node_exporter's textfile collector; the file is
+    replaced atomically so a scrape never sees a partial write.
+    """
+    path = _resolve(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(render_prometheus())
+    os.replace(tmp, path)
+
+def write_run_report(summary: dict, directory) -> Path:
+    """Write the run summary plus current metrics as run_<UTC timestamp>.json."""
+    finished = datetime.now(timezone.utc)
+    directory = _resolve(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    path = directory / f"run_{finished.strftime('%Y%m%dT%H%M%SZ')}.json"
+    report = {
+        "finished_at": finished.isoformat(),
+        "summary": summary,
+        "metrics": snapshot(),
+    }
+    path.write_text(json.dumps(report, indent=2, default=str))
+
+    logger.info(f"Run report written to {path}")
+    return path
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_metrics_server(port: int, host: str = "0.0.0.0"):
+    """Serve /metrics for Prometheus scrapes from a daemon thread (once per process)."""
+    global _server
+
+    with _lock:
+        if _server is not None:
+            return _server
+
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving Prometheus metrics on {host}:{port}/metrics")
+    return _server
@@ -0,0 +1,93 @@
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import text
+
+from logger import get_logger
+
+logger = get_logger()
+
+# Always resolve to project root (one level above src/)
+SCHEMA_DIR = Path(__file__).resolve().parents[1] / "sql" / "schema"
+
+# Opt-in migrations, applied with run_migrations(engine, COMPACT_DIR)
+COMPACT_DIR = Path(__file__).resolve().parents[1] / "sql" / "compact"
+
+# Arbitrary constant; serializes concurrent runners across containers
+MIGRATION_LOCK_KEY = 7_240_315
+
+def run_migrations(engine, schema_dir: Path = SCHEMA_DIR):
+    """
+    Apply the numbered *.sql files of schema_dir (sql/schema by default)
+    not yet recorded in schema_migrations, in order, each in its own
+    transaction.
+
+    The files are idempotent, so databases initialized by
+    docker-entrypoint-initdb.d (which runs them without recording) are
+    simply brought up to date and recorded on the first run.
+    Returns the list of files applied.
+    """
+    applied_now = []
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        conn.commit()
+
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version TEXT PRIMARY KEY,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """))
+            applied = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+            conn.commit()
+
+            for path in sorted(schema_dir.glob("[0-9]*.sql")):
+                if path.stem in applied:
+                    continue
+
+                logger.info(f"Applying migration {path.name}")
+                try:
+                    # Straight to the driver without parameters, so format()
+                    # placeholders like %I / %L in the SQL are left alone
+                    cursor = conn.connection.cursor()
+                    try:
+                        cursor.execute(path.read_text())
+                    finally:
+                        cursor.close()
+                    conn.execute(
+                        text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+                        {"version": path.stem},
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    logger.exception(f"Migration {path.name} failed")
+                    raise
+
+                applied_now.append(path.name)
+
+            ensure_partitions(conn)
+            conn.commit()
+
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
+
+    if applied_now:
+        logger.info(f"Applied {len(applied_now)} migrations: {', '.join(applied_now)}")
+
+    return applied_now
+
+def ensure_partitions(conn, years_ahead: int = 1):
+    """Make sure daily_prices has partitions up to `years_ahead` past this year."""
+    exists = conn.execute(
+        text("SELECT to_regproc('ensure_daily_prices_partition') IS NOT NULL")
+    ).scalar()
+    if not exists:
+        return
+
+    this_year = date.today().year
+    for year in range(this_year, this_year + years_ahead + 1):
+        conn.execute(text("SELECT ensure_daily_prices_partition(:year)"), {"year": year})
@@ -1,51 +1,805 @@
+from bar_cache import configure_raw_cache
+from fetch_scheduler import configure_fetch_scheduler, get_fetch_scheduler
 from fetch_yahoo import fetch_daily_prices
-from db import upsert_prices, get_latest_date
+from db import (
+    upsert_prices,
+    revise_prices,
+    get_price_tail,
+    get_price_history,
+    get_close_panel,
+    update_indicators,
+    get_watermarks,
+    record_run_status,
+)
 from logger import get_logger
-from transform import compute_indicators
+from metrics import reset as reset_metrics, write_prometheus, write_run_report
+from repository import get_available_tickers
+from rollups import refresh_rollups
+from work_queue import enqueue_tickers, run_queue_worker
+from transform import (
+    compute_indicators_incremental,
+    compute_indicators_panel,
+    INDICATOR_COLUMNS,
+    LOOKBACK_ROWS,
+    MA_WINDOWS,
+    RSI_PERIOD,
+)
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
 from pathlib import Path
+import pandas as pd
+import queue
+import threading
+import time
 import yaml
 
 logger = get_logger()
 
+CONFIG_DIR = Path(__file__).resolve().parents[1] / "config"
+
+DEFAULT_WORKERS = 1
+FULL_LOAD_START = "2000-01-01"
+DEFAULT_RECOMPUTE_BATCH = 500
+
+# Trailing days of stored history re-fetched and diffed on each
+# incremental load; 0 = only fetch new bars
+DEFAULT_REVISION_DAYS = 0
+
+# Calendar days fetched and written per chunk; 0 = whole range at once
+DEFAULT_CHUNK_DAYS = 0
+
 def load_tickers_from_file():
-    config_path = Path(__file__).resolve().parents[1] / "config" / "tickers.yaml"
+    config_path = CONFIG_DIR / "tickers.yaml"
 
     with open(config_path, "r") as f:
         data = yaml.safe_load(f)
 
     return data.get("tickers", [])
 
-def run_pipeline(tickers, engine):
+def load_pipeline_config():
+    config_path = CONFIG_DIR / "pipeline.yaml"
+
+    if not config_path.exists():
+        return {}
+
+    with open(config_path, "r") as f:
+        data = yaml.safe_load(f) or {}
+
+    return data.get("pipeline", {})
+
+def run_pipeline(
+    tickers,
+    engine,
+    workers: int = DEFAULT_WORKERS,
+    revision_days: int = DEFAULT_REVISION_DAYS,
+    chunk_days: int = DEFAULT_CHUNK_DAYS,
+):
+    """
+    Run the ingestion for every ticker and return a run summary.
+
+    With workers > 1 tickers are processed concurrently on a thread pool;
+    each ticker is isolated, so a failing symbol is recorded in the
+    summary instead of aborting the run. revision_days and chunk_days are
+    passed to process_one_ticker.
+    """
     if isinstance(tickers, str):
         tickers = [tickers]
 
-    for ticker in tickers:
-        process_one_ticker(ticker, engine)
-    
-def process_one_ticker(ticker: str, engine):
-    logger.info(f"Starting pipeline for: {ticker}")
-    latest_date = get_latest_date(ticker, engine)
+    workers = max(1, min(int(workers), len(tickers) or 1))
+
+    summary = {
+        "succeeded": [],
+        "failed": {},
+        "workers": workers,
+        "elapsed_seconds": 0.0,
+    }
+
+    started = time.perf_counter()
 
-    if latest_date:
-        start = latest_date + timedelta(days=1)
-        logger.info(f"Incremental load from {start}")
+    watermarks = get_watermarks(tickers, engine)
+    options = {"revision_days": revision_days, "chunk_days": chunk_days}
+
+    if workers == 1:
+        for ticker in tickers:
+            _run_isolated(ticker, engine, watermarks.get(ticker), summary, options)
     else:
-        start = "2000-01-01"
-        logger.info("No existing data found — Full historical load")
+        with ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="pipeline",
+        ) as executor:
+            futures = {
+                executor.submit(
+                    process_one_ticker,
+                    ticker,
+                    engine,
+                    watermarks.get(ticker),
+                    **options,
+                ): ticker
+                for ticker in tickers
+            }
+            for future in as_completed(futures):
+                _record_result(futures[future], future.exception(), summary)
+
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+
+    record_run_status(
+        {
+            **{ticker: None for ticker in summary["succeeded"]},
+            **summary["failed"],
+        },
+        engine,
+    )
+
+    logger.info(
+        f"Pipeline run finished: {len(summary['succeeded'])} succeeded, "
+        f"{len(summary['failed'])} failed in {summary['elapsed_seconds']}s "
+        f"({workers} workers)"
+    )
+    for ticker, error in summary["failed"].items():
+        logger.warning("Ticker %s failed: %s", ticker, error, extra={"ticker": ticker})
+
+    return summary
+
+def _run_isolated(ticker, engine, last_date, summary, options):
+    try:
+        process_one_ticker(ticker, engine, last_date, **options)
+    except Exception as e:
+        _record_result(ticker, e, summary)
+    else:
+        _record_result(ticker, None, summary)
+
+def _record_result(ticker, error, summary):
+    if error is None:
+        summary["succeeded"].append(ticker)
+        return
+
+    logger.error(
+        "Pipeline failed for: %s", ticker,
+        exc_info=(type(error), error, error.__traceback__),
+        extra={"ticker": ticker},
+    )
+    summary["failed"][ticker] = f"{type(error).__name__}: {error}"
+
+_UNPLANNED = object()
+
+def process_one_ticker(
+    ticker: str,
+    engine,
+    last_date=_UNPLANNED,
+    revision_days: int = DEFAULT_REVISION_DAYS,
+    chunk_days: int = DEFAULT_CHUNK_DAYS,
+):
+    """
+    Fetch, compute and store new bars for one ticker.
+
+    last_date is the ticker's watermark as planned by run_pipeline
+    (None = nothing stored yet); it is looked up when not given.
+
+    With revision_days > 0 the last revision_days of stored history are
+    re-fetched too; stored rows whose content changed are rewritten and
+    their indicators recomputed from the earliest changed date.
+
+    With chunk_days > 0 the load is streamed in date chunks of that size:
+    each chunk is fetched, computed (rolling windows seeded by the tail of
+    the previous chunk) and committed before the next is fetched, so
+    memory stays bounded by the chunk size. Every commit advances the
+    watermark, so an interrupted backfill resumes after the last chunk.
+    """
+    logger.info("Starting pipeline for: %s", ticker, extra={"ticker": ticker})
+
+    if last_date is _UNPLANNED:
+        last_date = get_watermarks([ticker], engine).get(ticker)
+
+    start, refresh_from = _plan_window(last_date, revision_days)
+    chunks = _fetch_chunks(ticker, start, chunk_days, refresh_from)
+
+    history = None
+    inserted = 0
+
+    for df in chunks:
+        stored, new = _split_stored(df, last_date)
+
+        if not new.empty:
+            if history is None and last_date:
+                # Only now read the stored tail that seeds the indicator windows
+                history = get_price_tail(ticker, engine, LOOKBACK_ROWS)
+
+            new = compute_indicators_incremental(new, history)
+
+            # Carry only the rolling-window state into the next chunk
+            history = _carry_tail(history, new)
 
-    df = fetch_daily_prices(ticker, start=start)
+        written = _write_chunk(ticker, engine, stored, new, revision_days)
+        inserted += written["inserted"]
 
-    if df.empty:
+        if written["revised"]:
+            # Re-read the seed; the carried closes predate the revision
+            history = None
+
+    if not inserted:
         logger.info("No new data to insert from Yahoo Finance")
+
+    logger.info("Pipeline completed successfully for: %s", ticker, extra={"ticker": ticker})
+
+def _plan_window(last_date, revision_days):
+    """Return (fetch start, refresh_from) for a ticker's watermark."""
+    if not last_date:
+        logger.info("No existing data found — Full historical load")
+        return FULL_LOAD_START, None
+
+    start = last_date + timedelta(days=1)
+    logger.info("Incremental load from %s", start)
+
+    if not revision_days:
+        return start, None
+
+    start -= timedelta(days=revision_days)
+    logger.info("Re-checking stored bars from %s for revisions", start)
+    return start, start
+
+def _split_stored(df, last_date):
+    """Split fetched bars into (already stored, new) by the watermark."""
+    if df.empty or not last_date:
+        return df.iloc[0:0], df
+
+    # Yahoo can echo the last stored bar back; never seed with it twice
+    stored = df["date"] <= pd.Timestamp(last_date)
+    return df[stored], df[~stored]
+
+def _write_chunk(ticker, engine, stored, new, revision_days):
+    """
+    Apply revisions found among re-fetched `stored` bars, insert the `new`
+    bars (indicators already computed) and rebuild the touched rollups.
+    Returns {"inserted": rows, "revised": bool}.
+    """
+    changed_from = []
+    revised = False
+
+    if revision_days and not stored.empty:
+        revised_from = _apply_revisions(ticker, stored, engine)
+
+        if revised_from is not None:
+            revised = True
+            changed_from.append(revised_from)
+
+            if not new.empty:
+                # The new bars were seeded by pre-revision closes
+                history = get_price_tail(ticker, engine, LOOKBACK_ROWS)
+                new = compute_indicators_incremental(new, history)
+
+    inserted = 0
+    if not new.empty:
+        inserted = upsert_prices(new, engine)["inserted"]
+        if inserted:
+            changed_from.append(new["date"].min())
+
+    if changed_from:
+        # Only the weeks/months touched by new or revised bars are rebuilt
+        refresh_rollups(ticker, engine, since=min(changed_from))
+
+    return {"inserted": inserted, "revised": revised}
+
+def _date_chunks(start, chunk_days):
+    """Yield [start, end) windows of chunk_days up to today; end None = open."""
+    start = pd.Timestamp(start)
+
+    if not chunk_days:
+        yield start, None
         return
 
-    df = compute_indicators(df)
+    today = pd.Timestamp.today().normalize()
+    while start <= today:
+        end = start + pd.Timedelta(days=chunk_days)
+        yield start, (end if end <= today else None)
+        start = end
+
+def _fetch_chunks(ticker, start, chunk_days, refresh_from=None):
+    """Lazily fetch a ticker's bars chunk by chunk, oldest first."""
+    for chunk_start, chunk_end in _date_chunks(start, chunk_days):
+        if chunk_days:
+            logger.info(
+                "Fetching %s chunk %s → %s",
+                ticker, chunk_start.date(), chunk_end.date() if chunk_end is not None else "today",
+                extra={"ticker": ticker},
+            )
+        yield fetch_daily_prices(
+            ticker, start=chunk_start, end=chunk_end, refresh_from=refresh_from
+        )
+        # The revision window starts the first chunk; later chunks are new bars
+        refresh_from = None
+
+def _carry_tail(history, df):
+    """Last LOOKBACK_ROWS (date, close) rows across the stored history and df."""
+    tail = df[["date", "close"]]
+    if history is not None and len(tail) < LOOKBACK_ROWS:
+        tail = pd.concat([history[["date", "close"]], tail], ignore_index=True)
+    return tail.tail(LOOKBACK_ROWS).reset_index(drop=True)
+
+def _rebase_tail(carried, revised):
+    """
+    A carried tail rebased on the stored tail re-read after a revision:
+    the revised rows, then the carried rows newer than them.
+    """
+    if revised is None or revised.empty:
+        return carried
+
+    if carried is None:
+        return revised
+
+    newer = carried[pd.to_datetime(carried["date"]) > pd.Timestamp(revised["date"].iloc[-1])]
+    return _carry_tail(revised, newer)
+
+def _apply_revisions(ticker, df, engine):
+    """
+    Rewrite revised stored bars and recompute indicators from the earliest
+    one forward. Returns that date, or None when nothing changed.
+    """
+    result = revise_prices(df, engine)
+    if not result["revised"]:
+        return None
+
+    since = pd.Timestamp(result["since"])
+
+    stored = get_price_history(ticker, engine, since.date(), LOOKBACK_ROWS)
+    stored["date"] = pd.to_datetime(stored["date"])
+    seed = stored[stored["date"] < since]
+
+    rows = compute_indicators_incremental(
+        stored[stored["date"] >= since].assign(ticker=ticker),
+        seed,
+    )
+    update_indicators(rows, engine, INDICATOR_COLUMNS)
+
+    logger.info(
+        "Applied %d revised bars for %s; indicators recomputed from %s",
+        result["revised"], ticker, since.date(),
+        extra={"ticker": ticker},
+    )
+    return since
+
+# Queue sentinel: no more items from the upstream stage
+_DONE = object()
+
+class StageStats:
+    """Counters of one pipeline stage, shared by its worker threads."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.rows = 0
+        self.busy_seconds = 0.0
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.depth_max = 0
+        self._lock = threading.Lock()
+
+    def sample_depth(self, depth):
+        with self._lock:
+            self.depth_total += depth
+            self.depth_samples += 1
+            self.depth_max = max(self.depth_max, depth)
+
+    def record(self, rows, seconds):
+        with self._lock:
+            self.items += 1
+            self.rows += rows
+            self.busy_seconds += seconds
+
+    def report(self, elapsed):
+        """
+        utilization = busy time / (wall time x workers); the stage closest
+        to 1.0, with a full input queue, is the bottleneck.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "items": self.items,
+                "rows": self.rows,
+                "busy_seconds": round(self.busy_seconds, 3),
+                "rows_per_second": round(self.rows / self.busy_seconds, 1) if self.busy_seconds else 0.0,
+                "utilization": round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed else 0.0,
+                "queue_depth_mean": round(self.depth_total / self.depth_samples, 2) if self.depth_samples else 0.0,
+                "queue_depth_max": self.depth_max,
+            }
 
-    upsert_prices(df, engine)
+class StagedPipeline:
+    """
+    Ingestion as three overlapping stages joined by bounded queues:
 
-    logger.info(f"Pipeline completed successfully for: {ticker}")
+        fetch (network) -> compute (indicators) -> write (DB)
 
-def run_pipeline_from_config(engine):
+    Different tickers are downloaded, computed and written at the same
+    time, and a full queue blocks its producer (backpressure). Chunks of
+    one ticker always go to the same compute and write worker, so they
+    are computed and committed in date order and the watermark-based
+    resume of process_one_ticker still holds.
+
+    A revision applied by the write stage is signalled back to compute,
+    which rebases its carried tail on the revised closes; chunks computed
+    before the signal arrived are recomputed from the stored tail when
+    they are written.
+
+    Per-stage throughput and queue depth end up in the run summary and
+    are logged every report_seconds while the run is in progress.
+    """
+
+    def __init__(
+        self,
+        engine,
+        fetch_workers: int = 4,
+        compute_workers: int = 1,
+        write_workers: int = 2,
+        queue_size: int = 16,
+        revision_days: int = DEFAULT_REVISION_DAYS,
+        chunk_days: int = DEFAULT_CHUNK_DAYS,
+        report_seconds: float = 10.0,
+    ):
+        self.engine = engine
+        self.fetch_workers = max(1, int(fetch_workers))
+        self.compute_workers = max(1, int(compute_workers))
+        self.write_workers = max(1, int(write_workers))
+        self.queue_size = max(1, int(queue_size))
+        self.revision_days = revision_days
+        self.chunk_days = chunk_days
+        self.report_seconds = report_seconds
+
+    def run(self, tickers):
+        """Run every ticker through the stages and return a run summary."""
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        started = time.perf_counter()
+
+        self._watermarks = get_watermarks(tickers, self.engine)
+        self._failed = {}
+        self._succeeded = []
+        # ticker -> (revisions applied so far, stored tail after the last one)
+        self._revisions = {}
+        self._lock = threading.Lock()
+
+        self._todo = queue.Queue()
+        for position, ticker in enumerate(tickers):
+            self._todo.put((position, ticker))
+
+        self._compute_queues = [queue.Queue(self.queue_size) for _ in range(self.compute_workers)]
+        self._write_queues = [queue.Queue(self.queue_size) for _ in range(self.write_workers)]
+
+        fetch_workers = min(self.fetch_workers, len(tickers) or 1)
+        self._stats = {
+            "fetch": StageStats("fetch", fetch_workers),
+            "compute": StageStats("compute", self.compute_workers),
+            "write": StageStats("write", self.write_workers),
+        }
+
+        fetchers = [
+            threading.Thread(target=self._fetch_stage, name=f"fetch-{i}", daemon=True)
+            for i in range(fetch_workers)
+        ]
+        workers = fetchers + [
+            threading.Thread(target=self._compute_stage, args=(i,), name=f"compute-{i}", daemon=True)
+            for i in range(self.compute_workers)
+        ] + [
+            threading.Thread(target=self._write_stage, args=(i,), name=f"write-{i}", daemon=True)
+            for i in range(self.write_workers)
+        ]
+        for worker in workers:
+            worker.start()
+
+        finished = threading.Event()
+        monitor = threading.Thread(target=self._monitor, args=(finished,), name="stage-monitor", daemon=True)
+        monitor.start()
+
+        for fetcher in fetchers:
+            fetcher.join()
+        for compute_queue in self._compute_queues:
+            compute_queue.put(_DONE)
+        for worker in workers:
+            worker.join()
+
+        finished.set()
+        monitor.join()
+
+        elapsed = round(time.perf_counter() - started, 3)
+        summary = {
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+            # Total, as in run_pipeline's summary; per stage under "stages"
+            "workers": sum(stats.workers for stats in self._stats.values()),
+            "elapsed_seconds": elapsed,
+            "stages": {name: stats.report(elapsed) for name, stats in self._stats.items()},
+        }
+
+        record_run_status(
+            {
+                **{ticker: None for ticker in summary["succeeded"]},
+                **summary["failed"],
+            },
+            self.engine,
+        )
+
+        logger.info(
+            f"Staged pipeline run finished: {len(summary['succeeded'])} succeeded, "
+            f"{len(summary['failed'])} failed in {elapsed}s"
+        )
+        for name, report in summary["stages"].items():
+            logger.info(
+                f"Stage {name}: {report['items']} chunks, {report['rows']} rows, "
+                f"{report['rows_per_second']} rows/s busy, utilization {report['utilization']}, "
+                f"queue depth mean {report['queue_depth_mean']} / max {report['queue_depth_max']}"
+            )
+        for ticker, error in summary["failed"].items():
+            logger.warning("Ticker %s failed: %s", ticker, error, extra={"ticker": ticker})
+
+        return summary
+
+    def _fail(self, ticker, error):
+        logger.error(
+            "Pipeline failed for: %s", ticker,
+            exc_info=(type(error), error, error.__traceback__),
+            extra={"ticker": ticker},
+        )
+        with self._lock:
+            self._failed.setdefault(ticker, f"{type(error).__name__}: {error}")
+
+    def _monitor(self, finished):
+        while not finished.wait(self.report_seconds):
+            depths = ", ".join(
+                f"{name}={sum(q.qsize() for q in queues)}/{self.queue_size * len(queues)}"
+                for name, queues in (("compute", self._compute_queues), ("write", self._write_queues))
+            )
+            logger.info(f"Stage queue depths: todo={self._todo.qsize()}, {depths}")
+
+    def _fetch_stage(self):
+        stats = self._stats["fetch"]
+
+        while True:
+            stats.sample_depth(self._todo.qsize())
+            try:
+                position, ticker = self._todo.get_nowait()
+            except queue.Empty:
+                return
+
+            target = self._compute_queues[position % len(self._compute_queues)]
+            last_date = self._watermarks.get(ticker)
+
+            try:
+                logger.info("Starting pipeline for: %s", ticker, extra={"ticker": ticker})
+                start, refresh_from = _plan_window(last_date, self.revision_days)
+                chunks = _fetch_chunks(ticker, start, self.chunk_days, refresh_from)
+
+                while True:
+                    began = time.perf_counter()
+                    df = next(chunks, None)
+                    if df is None:
+                        break
+                    stats.record(len(df), time.perf_counter() - began)
+
+                    target.put({
+                        "ticker": ticker,
+                        "position": position,
+                        "last_date": last_date,
+                        "df": df,
+                        "end": False,
+                    })
+            except Exception as e:
+                self._fail(ticker, e)
+            finally:
+                target.put({"ticker": ticker, "position": position, "end": True})
+
+    def _compute_stage(self, index):
+        stats = self._stats["compute"]
+        source = self._compute_queues[index]
+        history = {}
+        # ticker -> revision count its carried history reflects
+        seeded = {}
+
+        while True:
+            stats.sample_depth(source.qsize())
+            item = source.get()
+
+            if item is _DONE:
+                for write_queue in self._write_queues:
+                    write_queue.put(_DONE)
+                return
+
+            ticker = item["ticker"]
+            target = self._write_queues[item["position"] % len(self._write_queues)]
+
+            if item["end"]:
+                history.pop(ticker, None)
+                seeded.pop(ticker, None)
+                target.put(item)
+                continue
+
+            if ticker in self._failed:
+                continue
+
+            with self._lock:
+                revision, revised_tail = self._revisions.get(ticker, (0, None))
+
+            began = time.perf_counter()
+            try:
+                stored, new = _split_stored(item["df"], item["last_date"])
+
+                if ticker in history and seeded.get(ticker) != revision:
+                    # The carried closes predate a revision the write stage applied
+                    history[ticker] = _rebase_tail(history[ticker], revised_tail)
+                seeded[ticker] = revision
+
+                if not new.empty:
+                    if ticker not in history:
+                        history[ticker] = (
+                            get_price_tail(ticker, self.engine, LOOKBACK_ROWS)
+                            if item["last_date"] else None
+                        )
+                    new = compute_indicators_incremental(new, history[ticker])
+                    history[ticker] = _carry_tail(history[ticker], new)
+            except Exception as e:
+                self._fail(ticker, e)
+                continue
+            finally:
+                stats.record(len(item["df"]), time.perf_counter() - began)
+
+            target.put({**item, "df": None, "stored": stored, "new": new, "revision": revision})
+
+    def _write_stage(self, index):
+        stats = self._stats["write"]
+        source = self._write_queues[index]
+        remaining = self.compute_workers
+
+        while remaining:
+            stats.sample_depth(source.qsize())
+            item = source.get()
+
+            if item is _DONE:
+                remaining -= 1
+                continue
+
+            ticker = item["ticker"]
+
+            if item["end"]:
+                with self._lock:
+                    if ticker not in self._failed:
+                        self._succeeded.append(ticker)
+                        logger.info("Pipeline completed successfully for: %s", ticker, extra={"ticker": ticker})
+                continue
+
+            if ticker in self._failed:
+                continue
+
+            began = time.perf_counter()
+            try:
+                new = item["new"]
+                with self._lock:
+                    revision = self._revisions.get(ticker, (0, None))[0]
+                if item["revision"] != revision and not new.empty:
+                    # Computed before an earlier chunk's revision reached compute;
+                    # every earlier chunk is committed, so the stored tail is current
+                    new = compute_indicators_incremental(
+                        new, get_price_tail(ticker, self.engine, LOOKBACK_ROWS)
+                    )
+
+                written = _write_chunk(ticker, self.engine, item["stored"], new, self.revision_days)
+
+                if written["revised"]:
+                    tail = get_price_tail(ticker, self.engine, LOOKBACK_ROWS)
+                    with self._lock:
+                        self._revisions[ticker] = (revision + 1, tail)
+            except Exception as e:
+                self._fail(ticker, e)
+            finally:
+                stats.record(len(item["new"]), time.perf_counter() - began)
+
+def run_pipeline_from_config(engine, workers: int | None = None):
+    """
+    Run the configured tickers with config/pipeline.yaml settings; staged
+    mode is used when enabled there, unless `workers` forces the
+    whole-ticker thread pool.
+    """
     tickers = load_tickers_from_file()
-    run_pipeline(tickers, engine)
\ No newline at end of file
+    config = load_pipeline_config()
+    options = _apply_config(config)
+    reset_metrics()
+
+    stages = config.get("stages") or {}
+    if stages.get("enabled") and workers is None:
+        settings = {k: v for k, v in stages.items() if k != "enabled"}
+        summary = StagedPipeline(engine, **settings, **options).run(tickers)
+    else:
+        if workers is None:
+            workers = config.get("workers", DEFAULT_WORKERS)
+
+        summary = run_pipeline(tickers, engine, workers=workers, **options)
+
+    return _finish_run(summary, config)
+
+def run_queue_worker_from_config(engine, enqueue: bool = False):
+    """
+    Work the shared ingest_queue with config/pipeline.yaml settings until
+    it is drained; enqueue=True first queues the configured tickers.
+    Start as many of these (processes / containers) as needed.
+    """
+    config = load_pipeline_config()
+    options = _apply_config(config)
+    reset_metrics()
+
+    if enqueue:
+        enqueue_tickers(load_tickers_from_file(), engine)
+
+    settings = config.get("queue") or {}
+    summary = run_queue_worker(
+        engine,
+        lambda ticker: process_one_ticker(ticker, engine, **options),
+        **settings,
+    )
+
+    return _finish_run(summary, config)
+
+def _finish_run(summary, config):
+    """Attach fetch counters, then write the JSON run report and Prometheus file."""
+    summary["fetch"] = get_fetch_scheduler().stats()
+    logger.info(f"Fetch scheduler: {summary['fetch']}")
+
+    settings = config.get("metrics") or {}
+    try:
+        if settings.get("report_dir"):
+            write_run_report(summary, settings["report_dir"])
+        if settings.get("prometheus_file"):
+            write_prometheus(settings["prometheus_file"])
+    except Exception:
+        logger.exception("Failed to write run metrics")
+
+    return summary
+
+def _apply_config(config):
+    """Configure the raw cache and fetch scheduler; return per-ticker options."""
+    configure_raw_cache(config.get("raw_cache"))
+    configure_fetch_scheduler(config.get("fetch"))
+
+    return {
+        "revision_days": config.get("revision_window_days", DEFAULT_REVISION_DAYS),
+        "chunk_days": config.get("chunk_days", DEFAULT_CHUNK_DAYS),
+    }
+
+def recompute_indicators(
+    engine,
+    tickers=None,
+    batch_size: int = DEFAULT_RECOMPUTE_BATCH,
+    windows=MA_WINDOWS,
+    period=RSI_PERIOD,
+):
+    """
+    Recompute indicators over the full stored history of many tickers.
+
+    Each batch of tickers is loaded as one long panel, computed in a single
+    vectorized pass and written back with one bulk UPDATE. Only indicator
+    columns that exist in daily_prices are written.
+    """
+    if tickers is None:
+        tickers = get_available_tickers(engine)
+    elif isinstance(tickers, str):
+        tickers = [tickers]
+
+    started = time.perf_counter()
+    updated = 0
+
+    for i in range(0, len(tickers), batch_size):
+        batch = tickers[i:i + batch_size]
+
+        panel = get_close_panel(batch, engine)
+        if panel.empty:
+            continue
+
+        panel = compute_indicators_panel(panel, windows=windows, period=period)
+        columns = [c for c in panel.columns if c not in ("ticker", "date", "close")]
+
+        updated += update_indicators(panel, engine, columns)
+
+    elapsed = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"Recomputed indicators for {len(tickers)} tickers "
+        f"({updated} rows) in {elapsed}s"
+    )
+
+    return {"tickers": len(tickers), "rows": updated, "elapsed_seconds": elapsed}
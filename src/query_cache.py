@@ -0,0 +1,134 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from env import load_environment
+from logger import get_logger
+
+logger = get_logger()
+
+DEFAULT_MAX_MB = 256
+
+class LocalLRUCache:
+    """In-process cache bounded by approximate size, evicting least recently used."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key][0]
+        return found
+
+    def set_many(self, items):
+        with self._lock:
+            for key, value in items.items():
+                size = _frame_bytes(value)
+                if size > self.max_bytes:
+                    continue
+
+                if key in self._entries:
+                    self._size -= self._entries.pop(key)[1]
+
+                self._entries[key] = (value, size)
+                self._size += size
+
+            while self._size > self.max_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._size -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+class RedisCache:
+    """
+    Cache shared by every app replica pointing at the same Redis.
+
+    Size bounds and LRU eviction are Redis' own (maxmemory +
+    maxmemory-policy allkeys-lru); entries also expire after `ttl` seconds
+    as a safety net, since superseded versions are never read again.
+
+    Frames are stored as Arrow IPC streams, which decode to data only:
+    unlike pickle, a value written by anyone with access to the Redis
+    cannot run code in the reading process.
+    """
+
+    # v2: Arrow IPC values; pickled entries of older versions under "yfp:"
+    # are never read and expire with their TTL
+    def __init__(self, url, ttl=24 * 3600, prefix="yfp:v2:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+
+        values = self._client.mget([self.prefix + k for k in keys])
+        return {
+            key: _frame_from_ipc(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def set_many(self, items):
+        pipe = self._client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self.prefix + key, _frame_to_ipc(value), ex=self.ttl)
+        pipe.execute()
+
+    def clear(self):
+        """Delete this cache's entries (keys under `prefix`) from Redis."""
+        keys = list(self._client.scan_iter(match=self.prefix + "*", count=1000))
+        for i in range(0, len(keys), 1000):
+            self._client.unlink(*keys[i:i + 1000])
+
+def _frame_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def _frame_to_ipc(df):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _frame_from_ipc(data):
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+@lru_cache(maxsize=1)
+def get_query_cache():
+    """
+    Return the process-wide repository cache.
+
+    REPOSITORY_CACHE_URL=redis://... shares it across replicas (needs the
+    redis package); otherwise an in-process LRU bounded by
+    REPOSITORY_CACHE_MAX_MB is used.
+    """
+    load_environment()
+    url = os.getenv("REPOSITORY_CACHE_URL")
+
+    if url:
+        try:
+            return RedisCache(url)
+        except Exception:
+            logger.exception("Failed to initialize Redis query cache — using local cache")
+
+    max_mb = float(os.getenv("REPOSITORY_CACHE_MAX_MB", DEFAULT_MAX_MB))
+    return LocalLRUCache(int(max_mb * 2**20))
@@ -1,52 +1,380 @@
+import io
+from datetime import date
+import numpy as np
 import pandas as pd
-from sqlalchemy import text, bindparam
 from logger import get_logger
+from metrics import count, timed
+from query_cache import get_query_cache
 
 logger = get_logger()
 
+PRICE_COLUMNS = ["close"]
+
+INDICATOR_COLUMNS = [
+    "close",
+    "ma_5",
+    "ma_20",
+    "ma_50",
+    "rsi",
+]
+
+# Columns whose peaks and troughs downsampling keeps for indicator frames:
+# the charted close and RSI lines (moving averages are smoothed closes)
+SHAPE_COLUMNS = ["close", "rsi"]
+
+# Every cached segment holds these columns; price and indicator series
+# are projections of the same cached rows
+SERIES_COLUMNS = ["date", "ticker", "close", "ma_5", "ma_20", "ma_50", "rsi"]
+
+# Chart-grade precision; half the memory of float64 for multi-ticker panels
+VALUE_DTYPE = "float32"
+
+# Source table of each resolution; rollup rows are dated by the last
+# trading day of their week/month
+RESOLUTION_SOURCES = {
+    "daily": "daily_prices",
+    "weekly": "price_rollups",
+    "monthly": "price_rollups",
+}
+
+# Approximate calendar days per bar, coarsest first (252 trading days/year)
+BAR_DAYS = {
+    "monthly": 365.25 / 12,
+    "weekly": 7,
+}
+
+# resolution="auto" picks the coarsest resolution giving at least this many bars
+MIN_CHART_BARS = 100
+
 def get_available_tickers(engine):
-    query = "SELECT DISTINCT ticker FROM daily_prices ORDER BY ticker"
+    # The pipeline-maintained watermark table; no scan of daily_prices
+    query = "SELECT ticker FROM tickers WHERE row_count > 0 ORDER BY ticker"
     return pd.read_sql(query, engine)["ticker"].tolist()
 
-def _enforce_price_dtypes(df):
-    if df.empty:
-        return df
+def _read_copy(engine, query, params, numeric_cols):
+    """
+    Run a SELECT through COPY ... TO STDOUT and parse the CSV stream with
+    pandas' C parser, so numeric columns land directly in VALUE_DTYPE,
+    dates in datetime64 and tickers in a categorical, without a Python
+    object (Decimal/date/str) per value.
+    """
+    with timed("query") as m:
+        df = _copy_to_frame(engine, query, params, numeric_cols)
+        m.rows = len(df)
+        m.bytes = int(df.memory_usage(deep=True).sum())
 
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    return df
 
-    numeric_cols = [
-        "close",
-    ]
+def _copy_to_frame(engine, query, params, numeric_cols):
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        try:
+            sql = cursor.mogrify(query, params).decode()
+            buffer = io.StringIO()
+            cursor.copy_expert(
+                f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+    finally:
+        raw.close()
 
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    buffer.seek(0)
+    df = pd.read_csv(
+        buffer,
+        dtype={"ticker": "category", **{col: VALUE_DTYPE for col in numeric_cols}},
+        parse_dates=["date"],
+    )
+
+    if df.empty:
+        # Header-only output carries no values to infer the date dtype from
+        df["date"] = pd.to_datetime(df["date"])
 
     return df
 
-def _enforce_indicator_dtypes(df):
-    if df.empty:
+SNAPSHOT_COLUMNS = [
+    "ticker", "date", "close", "ma_5", "ma_20", "ma_50", "rsi", "daily_return",
+    "prev_close", "prev_ma_5", "prev_ma_20", "prev_ma_50",
+]
+
+MA_COLUMNS = ("ma_5", "ma_20", "ma_50")
+
+def get_latest_snapshot(engine, tickers=None):
+    """Newest stored bar of each ticker (all tickers when None), one row per ticker."""
+    if isinstance(tickers, str):
+        tickers = [tickers]
+
+    where = "" if tickers is None else "WHERE ticker = ANY(%(tickers)s)"
+    return _read_copy(
+        engine,
+        f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM latest_snapshot {where} ORDER BY ticker",
+        {"tickers": list(tickers or [])},
+        SNAPSHOT_COLUMNS[2:],
+    )
+
+def screen_tickers(
+    engine,
+    rsi_below=None,
+    rsi_above=None,
+    min_return=None,
+    max_return=None,
+    cross_above=None,
+    cross_below=None,
+    limit=None,
+):
+    """
+    Universe-wide scan of latest_snapshot; every given condition must hold.
+
+    cross_above / cross_below name an MA column ("ma_5", "ma_20", "ma_50")
+    the close crossed on the latest bar, e.g. screen_tickers(engine,
+    cross_above="ma_50") or screen_tickers(engine, rsi_below=30).
+    Returns snapshot rows, most oversold (lowest RSI) first.
+    """
+    conditions = []
+    params = {"limit": limit}
+
+    for name, value, predicate in (
+        ("rsi_below", rsi_below, "rsi < %(rsi_below)s"),
+        ("rsi_above", rsi_above, "rsi > %(rsi_above)s"),
+        ("min_return", min_return, "daily_return >= %(min_return)s"),
+        ("max_return", max_return, "daily_return <= %(max_return)s"),
+    ):
+        if value is not None:
+            conditions.append(predicate)
+            params[name] = value
+
+    for ma, above in ((cross_above, True), (cross_below, False)):
+        if ma is None:
+            continue
+        if ma not in MA_COLUMNS:
+            raise ValueError(f"Unknown moving average: {ma}")
+
+        if above:
+            conditions.append(f"prev_close <= prev_{ma} AND close > {ma}")
+        else:
+            conditions.append(f"prev_close >= prev_{ma} AND close < {ma}")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    limit_clause = "LIMIT %(limit)s" if limit else ""
+
+    return _read_copy(
+        engine,
+        f"""
+        SELECT {", ".join(SNAPSHOT_COLUMNS)}
+        FROM latest_snapshot
+        {where}
+        ORDER BY rsi NULLS LAST, ticker
+        {limit_clause}
+        """,
+        params,
+        SNAPSHOT_COLUMNS[2:],
+    )
+
+def _get_data_versions(engine, tickers):
+    query = """
+        SELECT ticker, version
+        FROM data_versions
+        WHERE ticker = ANY(%(tickers)s)
+    """
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        try:
+            cursor.execute(query, {"tickers": list(tickers)})
+            return dict(cursor.fetchall())
+        finally:
+            cursor.close()
+    finally:
+        raw.close()
+
+def _segment_key(ticker, year, version, resolution="daily"):
+    return f"series:{resolution}:{ticker}:{year}:v{version}"
+
+def choose_resolution(start_date, end_date, min_bars=MIN_CHART_BARS):
+    """Coarsest resolution that still gives `min_bars` bars over the range."""
+    days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days
+
+    for resolution, bar_days in BAR_DAYS.items():
+        if days / bar_days >= min_bars:
+            return resolution
+
+    return "daily"
+
+def _resolve(resolution, start_date, end_date):
+    if resolution == "auto":
+        return choose_resolution(start_date, end_date)
+
+    if resolution not in RESOLUTION_SOURCES:
+        raise ValueError(f"Unknown resolution: {resolution}")
+
+    return resolution
+
+def _load_series(engine, tickers, start_date, end_date, resolution="daily"):
+    """
+    Return SERIES_COLUMNS rows for tickers within [start_date, end_date],
+    from daily_prices or from the weekly/monthly price_rollups.
+
+    Rows are cached per (ticker, calendar year) segment under the ticker's
+    data version, so overlapping ranges share segments and a write that
+    bumps the version makes the next read go to the database.
+    """
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    years = range(start.year, end.year + 1)
+
+    versions = _get_data_versions(engine, tickers)
+    keys = {
+        (ticker, year): _segment_key(ticker, year, versions.get(ticker, 0), resolution)
+        for ticker in tickers
+        for year in years
+    }
+
+    cache = get_query_cache()
+    try:
+        found = cache.get_many(list(keys.values()))
+    except Exception:
+        logger.warning("Query cache read failed — falling back to database", exc_info=True)
+        found = {}
+
+    missing = [segment for segment, key in keys.items() if key not in found]
+    count("query_cache_hits", len(keys) - len(missing))
+    count("query_cache_misses", len(missing))
+
+    if missing:
+        # One query; each ticker reads only its own missing years
+        runs = _year_runs(missing)
+        rollup_filter = "" if resolution == "daily" else "AND p.resolution = %(resolution)s"
+        df = _read_copy(
+            engine,
+            f"""
+            SELECT {", ".join(f"p.{col}" for col in SERIES_COLUMNS)}
+            FROM {RESOLUTION_SOURCES[resolution]} p
+            JOIN unnest(%(tickers)s::text[], %(starts)s::date[], %(ends)s::date[])
+                AS m(ticker, start_date, end_date)
+              ON p.ticker = m.ticker
+             AND p.date BETWEEN m.start_date AND m.end_date
+             {rollup_filter}
+            ORDER BY p.date
+            """,
+            {
+                "resolution": resolution,
+                "tickers": [ticker for ticker, _, _ in runs],
+                "starts": [date(first, 1, 1) for _, first, _ in runs],
+                "ends": [date(last, 12, 31) for _, _, last in runs],
+            },
+            SERIES_COLUMNS[2:],
+        )
+
+        # Segments without rows are cached too, as empty frames
+        fresh = {keys[segment]: df.iloc[0:0] for segment in missing}
+        for (ticker, year), segment in df.groupby(
+            [df["ticker"], df["date"].dt.year], sort=False
+        ):
+            if (ticker, year) in keys:
+                fresh[keys[(ticker, year)]] = segment
+
+        try:
+            cache.set_many(fresh)
+        except Exception:
+            logger.warning("Query cache write failed", exc_info=True)
+        found.update(fresh)
+
+    df = pd.concat([found[key] for key in keys.values()], ignore_index=True)
+    # Segments carry their own categories; concat falls back to strings
+    df["ticker"] = df["ticker"].astype("category")
+    df = df[df["date"].between(start, end)]
+    return df.sort_values(["date", "ticker"], kind="stable", ignore_index=True)
+
+def _year_runs(segments):
+    """(ticker, first_year, last_year) runs of consecutive years in (ticker, year) segments."""
+    runs = []
+    for ticker, year in sorted(segments):
+        if runs and runs[-1][0] == ticker and runs[-1][2] == year - 1:
+            runs[-1][2] = year
+        else:
+            runs.append([ticker, year, year])
+    return runs
+
+def downsample(df, max_points, value_cols):
+    """
+    Min/max-bucket a long (date, ticker, values...) frame to roughly
+    `max_points` distinct dates.
+
+    Dates are split into equal buckets; each bucket keeps the dates where
+    any ticker's value column reaches its min or max (plus the first and
+    last date), so peaks and troughs survive. The bucket count depends
+    only on len(value_cols), so each ticker's lines keep the same detail
+    however many tickers are charted. Every ticker keeps the union of the
+    kept dates, so pivoting by ticker stays aligned.
+    """
+    if df.empty or not max_points:
         return df
 
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    dates = np.unique(df["date"].to_numpy())
+    if len(dates) <= max_points:
+        return df
 
-    numeric_cols = [
-        "close",
-        "ma_5",
-        "ma_20",
-        "ma_50",
-        "rsi",
-        "daily_return",
-    ]
+    # Per ticker: a min and a max per bucket for each value column
+    buckets = max(1, (max_points - 2) // (2 * len(value_cols)))
 
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    position = np.searchsorted(dates, df["date"].to_numpy())
+    frame = df.assign(_bucket=position * buckets // len(dates), _position=position)
 
-    return df
+    keep = [np.array([0, len(dates) - 1])]
+    for col in value_cols:
+        ranked = (
+            frame.dropna(subset=[col])
+                 .sort_values(["ticker", "_bucket", col], kind="stable")
+        )
+        for extreme in ("first", "last"):
+            picked = ranked.drop_duplicates(["ticker", "_bucket"], keep=extreme)
+            keep.append(picked["_position"].to_numpy())
 
-def get_normalized_prices(engine, tickers, start_date, end_date):
-    df = get_prices_series(engine, tickers, start_date, end_date)
+    keep = np.unique(np.concatenate(keep))
+    return df[np.isin(position, keep)].reset_index(drop=True)
+
+def get_dashboard_view(
+    engine, tickers, start_date, end_date, max_points=None, resolution="daily"
+):
+    """
+    Everything one dashboard rerun charts, from a single series load:
+    {"resolution", "prices", "indicators", "normalized"}.
+
+    The rows are loaded (or served from the query cache) and downsampled
+    once; "prices" and "indicators" are column projections of that frame,
+    which share its buffers under pandas copy-on-write, and "normalized"
+    adds one derived column.
+    """
+    if isinstance(tickers, str):
+        tickers = [tickers]
+
+    resolution = _resolve(resolution, start_date, end_date)
+
+    if not tickers:
+        empty = pd.DataFrame()
+        return {"resolution": resolution, "prices": empty, "indicators": empty, "normalized": empty}
+
+    df = _load_series(engine, tickers, start_date, end_date, resolution)
+    # Normalization base from the full range: downsampling may drop a
+    # ticker's first bar
+    first_close = df.groupby("ticker", observed=True)["close"].first()
+    df = downsample(df[["date", "ticker", *INDICATOR_COLUMNS]], max_points, SHAPE_COLUMNS)
+
+    prices = df[["date", "ticker", *PRICE_COLUMNS]]
+    first_close = first_close.reindex(prices["ticker"]).to_numpy()
+
+    return {
+        "resolution": resolution,
+        "prices": prices,
+        "indicators": df,
+        "normalized": prices.assign(normalized=prices["close"] / first_close * 100),
+    }
+
+def get_normalized_prices(
+    engine, tickers, start_date, end_date, max_points=None, resolution="daily"
+):
+    df = get_prices_series(engine, tickers, start_date, end_date, resolution=resolution)
 
     if df.empty:
         return df
@@ -59,71 +387,47 @@ def get_normalized_prices(engine, tickers, start_date, end_date):
     )
 
     df["normalized"] = df["close"] / first_close * 100
-    return df
+    return downsample(df, max_points, ["normalized"])
 
-def get_prices_series(engine, tickers, start_date, end_date):
+def get_prices_series(
+    engine, tickers, start_date, end_date, max_points=None, resolution="daily"
+):
+    """
+    resolution: "daily", "weekly", "monthly" or "auto" (see choose_resolution).
+    """
     if isinstance(tickers, str):
         tickers = [tickers]
 
     if not tickers:
         return pd.DataFrame()
-    
-    query = text("""
-        SELECT date, ticker, close
-        FROM daily_prices
-        WHERE ticker IN :tickers
-          AND date BETWEEN :start AND :end
-        ORDER BY date
-    """).bindparams(
-        bindparam("tickers", expanding=True)
-    )
 
-    df = pd.read_sql(
-        query,
-        engine,
-        params={
-            "tickers": tickers,
-            "start": start_date,
-            "end": end_date,
-        }
-    )
-
-    return _enforce_price_dtypes(df)
+    resolution = _resolve(resolution, start_date, end_date)
+    df = _load_series(engine, tickers, start_date, end_date, resolution)
+    return downsample(df[["date", "ticker", *PRICE_COLUMNS]], max_points, PRICE_COLUMNS)
 
-def get_indicator_series(engine, tickers, start_date, end_date):
+def get_indicator_series(
+    engine, tickers, start_date, end_date, max_points=None, resolution="daily"
+):
+    """
+    resolution: "daily", "weekly", "monthly" or "auto"; rollup indicators
+    are computed over period closes (ma_5 on weekly bars = 5-week average).
+    """
     if isinstance(tickers, str):
         tickers = [tickers]
 
     if not tickers:
         return pd.DataFrame()
-    
+
     logger.debug(
     "Executing indicator query",
     extra={
         "tickers": tickers,
         "start": start_date,
         "end": end_date,
+        "resolution": resolution,
         },
     )
 
-    query = text("""
-        SELECT date, ticker, close, ma_5, ma_20, ma_50, rsi
-        FROM daily_prices
-        WHERE ticker IN :tickers
-        AND date BETWEEN :start AND :end
-        ORDER BY date
-    """).bindparams(
-        bindparam("tickers", expanding=True)
-    )
-
-    df = pd.read_sql(
-        query,
-        engine,
-        params={
-            "tickers": tickers,
-            "start": start_date,
-            "end": end_date,
-        }
-    )
-
-    return _enforce_indicator_dtypes(df)
\ No newline at end of file
+    resolution = _resolve(resolution, start_date, end_date)
+    df = _load_series(engine, tickers, start_date, end_date, resolution)
+    return downsample(df[["date", "ticker", *INDICATOR_COLUMNS]], max_points, SHAPE_COLUMNS)
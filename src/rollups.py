@@ -0,0 +1,159 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from db import bump_data_versions
+from logger import get_logger
+from metrics import timed
+from transform import indicator_kernel, LOOKBACK_ROWS
+
+logger = get_logger()
+
+# resolution -> PostgreSQL date_trunc unit
+RESOLUTIONS = {
+    "weekly": "week",
+    "monthly": "month",
+}
+
+# price_rollups column for each indicator_kernel output
+ROLLUP_INDICATORS = {
+    "ma_5": "ma_5",
+    "ma_20": "ma_20",
+    "ma_50": "ma_50",
+    "rsi": "rsi",
+    "daily_return": "period_return",
+}
+
+def period_start(day, resolution):
+    """First day of the period containing `day` (ISO weeks start Monday)."""
+    day = pd.Timestamp(day).date()
+    if resolution == "weekly":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+def refresh_rollups(ticker: str, engine, since=None):
+    """
+    Rebuild the weekly and monthly bars of a ticker for every period from
+    the one containing `since` onward (whole history when None), then
+    recompute their indicators seeded by the preceding periods. A ticker
+    without rollups before that period is rebuilt from its first bar, so
+    the windows never start from missing periods.
+
+    Runs in one transaction that also bumps the ticker's data version, so
+    cached rollup series are invalidated together with the new bars.
+    """
+    with timed("rollups"), engine.begin() as conn:
+        for resolution, unit in RESOLUTIONS.items():
+            first = period_start(since, resolution) if since is not None else date.min
+            if first != date.min and not _has_periods_before(conn, ticker, resolution, first):
+                first = date.min
+            _refresh_bars(conn, ticker, resolution, unit, first)
+            _refresh_indicators(conn, ticker, resolution, first)
+
+        bump_data_versions(conn, [ticker])
+
+    logger.info(
+        "Refreshed rollups for %s from %s",
+        ticker, first if first != date.min else "start of history",
+        extra={"ticker": ticker},
+    )
+
+def _has_periods_before(conn, ticker, resolution, first):
+    return conn.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM price_rollups
+            WHERE resolution = :resolution AND ticker = :ticker
+              AND period_start < :first
+        )
+    """), {"resolution": resolution, "ticker": ticker, "first": first}).scalar()
+
+def _refresh_bars(conn, ticker, resolution, unit, first):
+    conn.execute(text("""
+        INSERT INTO price_rollups (
+            resolution, ticker, period_start, date,
+            open, high, low, close, volume
+        )
+        SELECT
+            :resolution,
+            ticker,
+            CAST(date_trunc(:unit, date) AS DATE) AS period_start,
+            MAX(date),
+            (array_agg(open ORDER BY date))[1],
+            MAX(high),
+            MIN(low),
+            (array_agg(close ORDER BY date DESC))[1],
+            SUM(volume)
+        FROM daily_prices
+        WHERE ticker = :ticker
+          AND date >= :first
+        GROUP BY ticker, period_start
+        ON CONFLICT (resolution, ticker, period_start) DO UPDATE
+        SET date = EXCLUDED.date,
+            open = EXCLUDED.open,
+            high = EXCLUDED.high,
+            low = EXCLUDED.low,
+            close = EXCLUDED.close,
+            volume = EXCLUDED.volume
+    """), {"resolution": resolution, "unit": unit, "ticker": ticker, "first": first})
+
+def _refresh_indicators(conn, ticker, resolution, first):
+    # LOOKBACK_ROWS earlier periods seed the windows, as for daily loads
+    rows = conn.execute(text("""
+        SELECT period_start, close FROM (
+            (
+                SELECT period_start, close
+                FROM price_rollups
+                WHERE resolution = :resolution AND ticker = :ticker
+                  AND period_start < :first
+                ORDER BY period_start DESC
+                LIMIT :lookback
+            )
+            UNION ALL
+            (
+                SELECT period_start, close
+                FROM price_rollups
+                WHERE resolution = :resolution AND ticker = :ticker
+                  AND period_start >= :first
+            )
+        ) AS bars
+        ORDER BY period_start
+    """), {
+        "resolution": resolution,
+        "ticker": ticker,
+        "first": first,
+        "lookback": LOOKBACK_ROWS,
+    }).fetchall()
+
+    if not rows:
+        return
+
+    starts = [r.period_start for r in rows]
+    closes = np.array([np.nan if r.close is None else r.close for r in rows], dtype="float64")
+
+    keep = np.array([s >= first for s in starts])
+    values = indicator_kernel(closes)
+
+    params = {
+        "resolution": resolution,
+        "ticker": ticker,
+        "period_start": [s for s, k in zip(starts, keep) if k],
+    }
+    for name, column in ROLLUP_INDICATORS.items():
+        # NaN -> NULL, matching the daily COPY path
+        params[column] = [None if np.isnan(v) else float(v) for v in values[name][keep]]
+
+    assignments = ", ".join(f"{c} = u.{c}" for c in ROLLUP_INDICATORS.values())
+    arrays = ", ".join(f"CAST(:{c} AS DOUBLE PRECISION[])" for c in ROLLUP_INDICATORS.values())
+    names = ", ".join(ROLLUP_INDICATORS.values())
+
+    conn.execute(text(f"""
+        UPDATE price_rollups AS r
+        SET {assignments}
+        FROM unnest(CAST(:period_start AS DATE[]), {arrays})
+             AS u(period_start, {names})
+        WHERE r.resolution = :resolution
+          AND r.ticker = :ticker
+          AND r.period_start = u.period_start
+    """), params)
@@ -1,14 +1,24 @@
+import time
 import pandas as pd
 import numpy as np
 from logger import get_logger
+from metrics import record
 
 logger = get_logger()
 
+MA_WINDOWS = (5, 20, 50)
+RSI_PERIOD = 14
+
+INDICATOR_COLUMNS = [f"ma_{w}" for w in MA_WINDOWS] + ["daily_return", "rsi"]
+
+# Rows of stored history needed so the first new row sees full windows
+LOOKBACK_ROWS = max(max(MA_WINDOWS) - 1, RSI_PERIOD)
+
 # Moving Averages
 def add_moving_averages(
     df,
     price_col = "close",
-    windows=(5, 20, 50)
+    windows=MA_WINDOWS
 ):
     df = df.copy()
 
@@ -30,7 +40,7 @@ def add_daily_returns(
 def add_rsi(
     df,
     price_col = "close",
-    period = 14
+    period = RSI_PERIOD
 ):
     df = df.copy()
 
@@ -46,15 +56,81 @@ def add_rsi(
     df["rsi"] = rsi
     return df
 
+# Fused kernel
+def _rolling_mean(values, window, position):
+    out = np.full(len(values), np.nan)
+
+    if len(values) >= window:
+        # O(n) windowed sums from prefix sums; NaN poisons its windows like pandas
+        missing = np.isnan(values)
+        sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values))))
+        gaps = np.concatenate(([0], np.cumsum(missing)))
+
+        window_sums = sums[window:] - sums[:-window]
+        window_gaps = gaps[window:] - gaps[:-window]
+
+        out[window - 1:] = np.where(window_gaps == 0, window_sums / window, np.nan)
+
+    # Windows that would reach back into the previous series
+    out[position < window - 1] = np.nan
+    return out
+
+def indicator_kernel(close, windows=MA_WINDOWS, period=RSI_PERIOD, starts=None):
+    """
+    Compute every indicator column from a float close-price array.
+
+    Matches add_moving_averages / add_daily_returns / add_rsi (the
+    reference implementation) without building intermediate DataFrames.
+    `starts` optionally flags the first row of each series when `close`
+    holds several tickers back to back; no window crosses a flagged row.
+    Returns a dict of column name -> array aligned with `close`.
+    """
+    started = time.perf_counter()
+    close = np.asarray(close, dtype="float64")
+    index = np.arange(len(close))
+
+    if starts is None:
+        position = index
+    else:
+        position = index - np.maximum.accumulate(np.where(starts, index, 0))
+
+    first = position == 0
+    out = {}
+
+    for w in windows:
+        out[f"ma_{w}"] = _rolling_mean(close, w, position)
+
+    delta = np.full(len(close), np.nan)
+    delta[1:] = close[1:] - close[:-1]
+    delta[first] = np.nan
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_return = np.full(len(close), np.nan)
+        daily_return[1:] = close[1:] / close[:-1] - 1
+        daily_return[first] = np.nan
+        out["daily_return"] = daily_return
+
+        # NaN deltas count as neither gain nor loss, as in add_rsi
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+
+        rs = (
+            _rolling_mean(gain, period, position)
+            / _rolling_mean(loss, period, position)
+        )
+        out["rsi"] = 100 - (100 / (1 + rs))
+
+    record("transform", time.perf_counter() - started, rows=len(close), nbytes=close.nbytes)
+    return out
+
 # Compose function
 def compute_indicators(df):
     df = df.copy()
 
     df["close"] = pd.to_numeric(df["close"], errors="coerce")
-    
-    df = add_moving_averages(df)
-    df = add_daily_returns(df)
-    df = add_rsi(df)
+
+    for name, values in indicator_kernel(df["close"].to_numpy(dtype="float64")).items():
+        df[name] = values
 
     logger.info(
     "Computed technical indicators",
@@ -66,3 +142,70 @@ def compute_indicators(df):
 
     return df
 
+# Incremental (warm-start) compose function
+def compute_indicators_incremental(df, history):
+    """
+    Compute indicators for newly fetched rows only, seeding the rolling
+    windows with the `close` tail already stored for the ticker.
+
+    `history` holds the last LOOKBACK_ROWS stored rows in date order;
+    without it this falls back to compute_indicators.
+    """
+    if history is None or history.empty:
+        return compute_indicators(df)
+
+    df = df.copy()
+    df["close"] = pd.to_numeric(df["close"], errors="coerce")
+
+    closes = np.concatenate([
+        pd.to_numeric(history["close"], errors="coerce").to_numpy(dtype="float64"),
+        df["close"].to_numpy(dtype="float64"),
+    ])
+
+    for name, values in indicator_kernel(closes).items():
+        df[name] = values[len(history):]
+
+    logger.info(
+    "Computed technical indicators",
+    extra={
+        "rows": len(df),
+        "seed_rows": len(history),
+        },
+    )
+
+    return df
+
+# Panel (many tickers at once) compose function
+def compute_indicators_panel(df, windows=MA_WINDOWS, period=RSI_PERIOD):
+    """
+    Compute indicators for a long (ticker, date, close) frame holding many
+    tickers in one vectorized pass, with windows grouped per ticker.
+
+    Rows are returned sorted by ticker then date.
+    """
+    df = df.sort_values(["ticker", "date"], kind="stable", ignore_index=True)
+    df["close"] = pd.to_numeric(df["close"], errors="coerce")
+
+    codes = pd.factorize(df["ticker"])[0]
+    starts = np.ones(len(df), dtype=bool)
+    starts[1:] = codes[1:] != codes[:-1]
+
+    values = indicator_kernel(
+        df["close"].to_numpy(dtype="float64"),
+        windows=windows,
+        period=period,
+        starts=starts,
+    )
+    for name, column in values.items():
+        df[name] = column
+
+    logger.info(
+    "Computed technical indicators for panel",
+    extra={
+        "rows": len(df),
+        "tickers": int(starts.sum()),
+        "columns": list(values),
+        },
+    )
+
+    return df
@@ -0,0 +1,251 @@
+import os
+import socket
+import threading
+import time
+import uuid
+
+from sqlalchemy import text
+
+from db import record_run_status
+from logger import get_logger
+
+logger = get_logger()
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_HEARTBEAT_SECONDS = 60
+DEFAULT_MAX_ATTEMPTS = 3
+# Failed items wait retry_delay * 2^(attempts - 1) seconds before the next claim
+DEFAULT_RETRY_DELAY_SECONDS = 60
+
+def enqueue_tickers(tickers, engine):
+    """
+    Queue tickers for ingestion and return how many were (re)queued.
+    Items currently running keep their lease.
+    """
+    query = text("""
+        INSERT INTO ingest_queue (ticker)
+        SELECT unnest(CAST(:tickers AS TEXT[]))
+        ON CONFLICT (ticker) DO UPDATE
+        SET status = 'pending',
+            attempts = 0,
+            available_at = now(),
+            leased_by = NULL,
+            lease_expires_at = NULL,
+            last_error = NULL,
+            enqueued_at = now(),
+            updated_at = now()
+        WHERE ingest_queue.status <> 'running'
+           OR ingest_queue.lease_expires_at < now()
+    """)
+    with engine.begin() as conn:
+        queued = conn.execute(query, {"tickers": list(tickers)}).rowcount
+
+    logger.info(f"Enqueued {queued} of {len(tickers)} tickers")
+    return queued
+
+def claim_tickers(engine, worker_id, limit=1, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Lease up to `limit` claimable tickers to worker_id. Rows locked by
+    other claimers are skipped rather than waited on.
+    """
+    query = text("""
+        UPDATE ingest_queue AS q
+        SET status = 'running',
+            attempts = q.attempts + 1,
+            leased_by = :worker_id,
+            lease_expires_at = now() + make_interval(secs => :lease_seconds),
+            updated_at = now()
+        FROM (
+            SELECT ticker
+            FROM ingest_queue
+            WHERE (status = 'pending' AND available_at <= now())
+               OR (status = 'running' AND lease_expires_at < now())
+            ORDER BY available_at, ticker
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        ) AS claimable
+        WHERE q.ticker = claimable.ticker
+        RETURNING q.ticker, q.attempts
+    """)
+    with engine.begin() as conn:
+        rows = conn.execute(query, {
+            "worker_id": worker_id,
+            "limit": limit,
+            "lease_seconds": lease_seconds,
+        }).fetchall()
+
+    return [(r.ticker, r.attempts) for r in rows]
+
+def extend_leases(engine, worker_id, tickers, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Heartbeat: push out the leases worker_id still holds on tickers."""
+    if not tickers:
+        return 0
+
+    query = text("""
+        UPDATE ingest_queue
+        SET lease_expires_at = now() + make_interval(secs => :lease_seconds),
+            updated_at = now()
+        WHERE ticker = ANY(:tickers)
+          AND leased_by = :worker_id
+          AND status = 'running'
+    """)
+    with engine.begin() as conn:
+        return conn.execute(query, {
+            "tickers": list(tickers),
+            "worker_id": worker_id,
+            "lease_seconds": lease_seconds,
+        }).rowcount
+
+def complete_ticker(engine, worker_id, ticker):
+    query = text("""
+        UPDATE ingest_queue
+        SET status = 'done',
+            leased_by = NULL,
+            lease_expires_at = NULL,
+            last_error = NULL,
+            updated_at = now()
+        WHERE ticker = :ticker AND leased_by = :worker_id
+    """)
+    with engine.begin() as conn:
+        conn.execute(query, {"ticker": ticker, "worker_id": worker_id})
+
+def fail_ticker(
+    engine,
+    worker_id,
+    ticker,
+    error,
+    max_attempts=DEFAULT_MAX_ATTEMPTS,
+    retry_delay=DEFAULT_RETRY_DELAY_SECONDS,
+):
+    """Requeue a failed ticker with backoff, or park it as failed after max_attempts."""
+    query = text("""
+        UPDATE ingest_queue
+        SET status = CASE WHEN attempts < :max_attempts THEN 'pending' ELSE 'failed' END,
+            available_at = now() + make_interval(
+                secs => :retry_delay * power(2, GREATEST(attempts - 1, 0))
+            ),
+            leased_by = NULL,
+            lease_expires_at = NULL,
+            last_error = :error,
+            updated_at = now()
+        WHERE ticker = :ticker AND leased_by = :worker_id
+        RETURNING status
+    """)
+    with engine.begin() as conn:
+        status = conn.execute(query, {
+            "ticker": ticker,
+            "worker_id": worker_id,
+            "error": error,
+            "max_attempts": max_attempts,
+            "retry_delay": retry_delay,
+        }).scalar()
+
+    return status
+
+def queue_pending(engine):
+    """Items not finished yet: pending (including backing off) or running."""
+    query = text("SELECT COUNT(*) FROM ingest_queue WHERE status IN ('pending', 'running')")
+    with engine.connect() as conn:
+        return conn.execute(query).scalar()
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+def run_queue_worker(
+    engine,
+    process,
+    worker_id=None,
+    threads=1,
+    lease_seconds=DEFAULT_LEASE_SECONDS,
+    heartbeat_seconds=DEFAULT_HEARTBEAT_SECONDS,
+    max_attempts=DEFAULT_MAX_ATTEMPTS,
+    retry_delay=DEFAULT_RETRY_DELAY_SECONDS,
+    poll_seconds=5.0,
+):
+    """
+    Claim and process tickers until the queue is drained, then return a
+    summary like run_pipeline's.
+
+    process(ticker) ingests one ticker. Any number of workers (threads
+    here, or replicas elsewhere) can run against the same queue; a
+    heartbeat thread keeps the leases of in-progress tickers alive, so
+    only a crashed worker's tickers are picked up again.
+    """
+    worker_id = worker_id or default_worker_id()
+
+    summary = {"succeeded": [], "failed": {}, "workers": threads, "elapsed_seconds": 0.0}
+    held = set()
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(heartbeat_seconds):
+            with lock:
+                tickers = list(held)
+            try:
+                extend_leases(engine, worker_id, tickers, lease_seconds)
+            except Exception:
+                logger.warning("Lease heartbeat failed", exc_info=True)
+
+    def work():
+        while True:
+            claimed = claim_tickers(engine, worker_id, 1, lease_seconds)
+
+            if not claimed:
+                if not queue_pending(engine):
+                    return
+                # Only leased or backing-off items left; they may come back
+                time.sleep(poll_seconds)
+                continue
+
+            ticker, attempt = claimed[0]
+            with lock:
+                held.add(ticker)
+
+            try:
+                process(ticker)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                logger.error(
+                    "Pipeline failed for: %s (attempt %d)", ticker, attempt,
+                    exc_info=(type(e), e, e.__traceback__),
+                    extra={"ticker": ticker},
+                )
+                status = fail_ticker(engine, worker_id, ticker, error, max_attempts, retry_delay)
+                if status == "failed":
+                    with lock:
+                        summary["failed"][ticker] = error
+                    record_run_status({ticker: error}, engine)
+            else:
+                complete_ticker(engine, worker_id, ticker)
+                with lock:
+                    summary["succeeded"].append(ticker)
+                record_run_status({ticker: None}, engine)
+            finally:
+                with lock:
+                    held.discard(ticker)
+
+    logger.info(f"Queue worker {worker_id} started with {threads} threads")
+    started = time.perf_counter()
+
+    beat = threading.Thread(target=heartbeat, name="lease-heartbeat", daemon=True)
+    beat.start()
+
+    workers = [
+        threading.Thread(target=work, name=f"queue-worker-{i}")
+        for i in range(max(1, threads))
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    stop.set()
+    beat.join()
+
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"Queue worker {worker_id} finished: {len(summary['succeeded'])} succeeded, "
+        f"{len(summary['failed'])} failed in {summary['elapsed_seconds']}s"
+    )
+    return summary